@@ -1,6 +1,14 @@
 from django.contrib import admin
 from reviews.models import Category, Comment, Genre, Review, Title
 
+from .models import OutboundEmail
+
 admin.site.register(
     [Title, Genre, Category, Review, Comment]
 )
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'created')
+    list_filter = ('status',)
@@ -0,0 +1,79 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern, URLResolver
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@functools.lru_cache(maxsize=None)
+def get_executor():
+    return ThreadPoolExecutor(
+        max_workers=settings.ASYNC_READ_THREADS,
+        thread_name_prefix='async-read'
+    )
+
+
+def run_read(view, request, *args, **kwargs):
+    """
+    A request lifetime of its own in a pool thread:
+    the thread's connection is checked before and after like
+    request_started/request_finished do for the request thread
+    """
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """
+    Async version of a DRF view: reads run in a pool of
+    ASYNC_READ_THREADS threads, so under ASGI requests waiting on
+    the database do not queue behind each other on the one thread Django
+    runs sync views on. Writes keep that thread
+    """
+    sync_view = sync_to_async(view)
+
+    @functools.wraps(view)
+    async def read_view(request, *args, **kwargs):
+        if request.method not in READ_METHODS:
+            return await sync_view(request, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(get_executor(), functools.partial(
+            context.run, run_read, view, request, *args, **kwargs
+        ))
+
+    return read_view
+
+
+def async_read_urls(patterns, views):
+    """
+    Copy of the url patterns with the views of the viewsets
+    replaced by async_read_view
+    """
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(
+                pattern.pattern,
+                async_read_urls(pattern.url_patterns, views),
+                pattern.default_kwargs, pattern.app_name, pattern.namespace
+            )
+        elif getattr(pattern.callback, 'cls', None) in views:
+            pattern = URLPattern(
+                pattern.pattern, async_read_view(pattern.callback),
+                pattern.default_args, pattern.name
+            )
+        result.append(pattern)
+    return result
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTTokenUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from users.models import User
+
+# claims put into tokens by api.utils.get_tokens_for_user
+STATE_FIELDS = ('role', 'is_staff', 'is_active')
+
+
+def state_key(user_id):
+    return f'auth:user-state:{user_id}'
+
+
+def user_state(user):
+    return {field: getattr(user, field) for field in STATE_FIELDS}
+
+
+def cache_user_state(user_id, state):
+    """
+    state is None for deleted users
+    """
+    cache.set(
+        state_key(user_id), state if state is not None else {},
+        settings.JWT_USER_STATE_CACHE_TIMEOUT
+    )
+
+
+def get_user_state(user_id):
+    """
+    Current role and flags of the user: from the cache,
+    from the database once per JWT_USER_STATE_CACHE_TIMEOUT otherwise
+    """
+    state = cache.get(state_key(user_id))
+    if state is None:
+        state = User.objects.filter(pk=user_id).values(*STATE_FIELDS).first()
+        cache_user_state(user_id, state)
+    return state or None
+
+
+class ClaimsUser(TokenUser):
+    """
+    User built from token claims, has the role properties
+    the permission classes use, no database row behind it
+    """
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', User.USER)
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_staff
+
+    @property
+    def is_user(self):
+        return self.role == User.USER
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+
+class ClaimsJWTAuthentication(JWTTokenUserAuthentication):
+    """
+    Authenticates without loading users.User: the user is built from
+    the token claims, role changes and deactivation are picked up from
+    a short-lived cache of the user's state that signals keep current
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user = ClaimsUser(validated_token)
+        state = get_user_state(user.id)
+        if state is None:
+            raise AuthenticationFailed(
+                'User not found', code='user_not_found'
+            )
+        if not state['is_active']:
+            raise AuthenticationFailed(
+                'User is inactive', code='user_inactive'
+            )
+        # claims can be older than the latest role change
+        user.role = state['role']
+        user.is_staff = state['is_staff']
+        return user
+
+
+def token_user_id(request):
+    """
+    User id claim of a valid bearer token of the request, None without
+    one. For middleware, which runs before DRF authenticates the request
+    """
+    authentication = JWTTokenUserAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def load_user(user):
+    """
+    Database user for a request user, for views that need the full profile
+    """
+    if isinstance(user, User):
+        return user
+    return get_object_or_404(User, pk=user.id)
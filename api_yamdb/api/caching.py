@@ -0,0 +1,129 @@
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+
+from .routers import reading_primary
+
+CACHED_HEADERS = ('Allow', 'Vary', 'ETag')
+# every cached response depends on it, bulk changes invalidate it
+CATALOG_SCOPE = 'catalog'
+
+
+def get_options():
+    return getattr(settings, 'API_RESPONSE_CACHE', {})
+
+
+def get_cache():
+    return caches[get_options().get('CACHE', 'default')]
+
+
+def scope_key(scope):
+    return f'api-response:scope:{scope}'
+
+
+def scope_versions(scopes):
+    """
+    Current version token of every scope, a missing (evicted) token
+    is replaced with a new one, so nothing cached under it is served
+    """
+    cache = get_cache()
+    keys = [scope_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = uuid.uuid4().hex
+            cache.set(key, versions[key], None)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*scopes):
+    """
+    Cached responses that depend on any of the scopes are never hit again,
+    they expire by timeout
+    """
+    get_cache().set_many(
+        {scope_key(scope): uuid.uuid4().hex for scope in scopes}, None
+    )
+
+
+def invalidate_on_commit(*scopes):
+    """
+    Invalidates when the current transaction commits: a response read
+    from the old rows before the commit is not stored under the new tokens
+    """
+    transaction.on_commit(lambda: invalidate(*scopes))
+
+
+def response_key(request, scopes):
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in request.GET.lists() for value in values
+    ))
+    versions = ':'.join(scope_versions([CATALOG_SCOPE, *scopes]))
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    digest = hashlib.md5(f'{url}:{versions}'.encode()).hexdigest()
+    return f'api-response:{digest}'
+
+
+def is_cacheable_request(request):
+    """
+    Anonymous JSON GET: no credentials, no browsable API
+    """
+    return (
+        get_options().get('ENABLED', False)
+        and request.method == 'GET'
+        and 'HTTP_AUTHORIZATION' not in request.META
+        and 'text/html' not in request.META.get('HTTP_ACCEPT', '')
+        and 'format' not in request.GET
+    )
+
+
+class CachedResponseMixin:
+    """
+    Serves anonymous GET requests from the cache before DRF
+    authenticates or touches the database.
+    Keys are built from the absolute path, the sorted query string and
+    version tokens of the scopes returned by get_cache_scopes,
+    model signals replace the tokens to invalidate (see api.signals).
+    Hits answer conditional requests from the cached ETag.
+    Misses read the primary database: a lagging replica would store
+    stale rows under the version tokens of a write for the whole timeout
+    """
+
+    def get_cache_scopes(self, **kwargs):
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+        cache = get_cache()
+        key = response_key(request, self.get_cache_scopes(**kwargs))
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type, headers = cached
+            response = HttpResponse(content, content_type=content_type)
+            for name, value in headers.items():
+                response[name] = value
+            if 'ETag' in headers:
+                return get_conditional_response(
+                    request, etag=headers['ETag'], response=response
+                )
+            return response
+
+        with reading_primary():
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, 'render'):
+            response.render()
+            cache.set(key, (
+                response.content,
+                response['Content-Type'],
+                {name: response[name] for name in CACHED_HEADERS
+                 if response.has_header(name)}
+            ), get_options().get('TIMEOUT', 60))
+        return response
@@ -0,0 +1,95 @@
+import csv
+import io
+import os
+from itertools import islice
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.utils import timezone
+
+# (csv file, model, csv files that have to be committed first)
+TABLES = (
+    ('category.csv', 'reviews.Category', ()),
+    ('genre.csv', 'reviews.Genre', ()),
+    ('users.csv', 'users.User', ()),
+    ('titles.csv', 'reviews.Title', ('category.csv',)),
+    ('genre_title.csv', 'reviews.Title_genre', ('titles.csv', 'genre.csv')),
+    ('review.csv', 'reviews.Review', ('titles.csv', 'users.csv')),
+    ('comments.csv', 'reviews.Comment', ('review.csv', 'users.csv')),
+)
+
+COPY_NULL = '\\N'
+
+
+def copy_columns(model, header):
+    """
+    Pairs every concrete field of the model with the csv column
+    holding its value (by field name or attname), None if there is none
+    """
+    columns = []
+    for field in model._meta.concrete_fields:
+        source = None
+        for name in (field.attname, field.name):
+            if name in header:
+                source = name
+                break
+        columns.append((field, source))
+    return columns
+
+
+def copy_row(columns, row, now=None):
+    """
+    Converts a csv row to COPY csv values,
+    missing columns get the model field default,
+    auto_now and auto_now_add ones the load time now
+    """
+    values = []
+    for field, source in columns:
+        if source is None:
+            if getattr(field, 'auto_now', False) or getattr(
+                field, 'auto_now_add', False
+            ):
+                value = now or timezone.now()
+            else:
+                value = field.get_default()
+        else:
+            value = row[source]
+            if value == '' and not field.empty_strings_allowed:
+                value = None
+            elif value is not None:
+                value = field.to_python(value)
+        values.append(COPY_NULL if value is None else value)
+    return values
+
+
+def copy_table(path, filename, model_label, chunk_size):
+    """
+    Streams one csv file into its table with COPY FROM STDIN,
+    chunk by chunk in a single transaction, returns the number of rows
+    """
+    model = apps.get_model(model_label)
+    quote = connection.ops.quote_name
+    loaded = 0
+    with open(os.path.join(path, filename), 'r',
+              encoding='utf-8', newline='') as file:
+        rows = csv.DictReader(file)
+        columns = copy_columns(model, rows.fieldnames or ())
+        now = timezone.now()
+        sql = (
+            f'COPY {quote(model._meta.db_table)} '
+            f'({", ".join(quote(field.column) for field, _ in columns)}) '
+            f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in chunk:
+                    writer.writerow(copy_row(columns, row, now))
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                loaded += len(chunk)
+    return loaded
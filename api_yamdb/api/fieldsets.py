@@ -0,0 +1,68 @@
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Keeps only the fields listed in context['fields'], all of them
+    when it is not set
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """
+    ?fields=id,name on GET narrows the response to these fields
+    (the serializer needs SparseFieldsSerializerMixin), the query loads
+    only the columns they need, relations that are not requested
+    are neither joined nor prefetched.
+    sparse_paths maps a serializer field to the model paths it reads,
+    the field name itself by default: 'relation__field' is joined,
+    a many to many relation is prefetched.
+    sparse_always are loaded whatever is requested
+    """
+    sparse_paths = {}
+    sparse_always = ()
+
+    @cached_property
+    def sparse_fields(self):
+        value = self.request.query_params.get('fields')
+        if self.request.method != 'GET' or not value:
+            return None
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = set(fields) - set(self.get_serializer_class()().fields)
+        if unknown:
+            raise ValidationError({
+                'fields': [f'Неизвестные поля: {", ".join(sorted(unknown))}']
+            })
+        return fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.sparse_fields is not None:
+            context['fields'] = self.sparse_fields
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.sparse_fields is None:
+            return queryset
+        queryset = queryset.select_related(None).prefetch_related(None)
+        only = list(self.sparse_always)
+        for name in self.sparse_fields:
+            for path in self.sparse_paths.get(name, (name,)):
+                relation = path.split('__')[0]
+                field = queryset.model._meta.get_field(relation)
+                if field.many_to_many:
+                    queryset = queryset.prefetch_related(path)
+                    continue
+                if '__' in path:
+                    queryset = queryset.select_related(relation)
+                only.append(path)
+        return queryset.only(*only)
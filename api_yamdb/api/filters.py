@@ -1,5 +1,15 @@
+from django.db.models import Count
 from django_filters import rest_framework as f
 from reviews.models import Title
+from reviews.search import search_titles
+
+GenreTitle = Title.genre.through
+
+
+class CharInFilter(f.BaseInFilter, f.CharFilter):
+    """
+    Comma separated values, e.g. ?category=movie,book
+    """
 
 
 class TitleFilter(f.FilterSet):
@@ -8,14 +18,45 @@ class TitleFilter(f.FilterSet):
     enables filtering by related model's slug field
     without double underscore in the url
     e.g. ?genre=drama
+    slugs are exact, several are separated by commas:
+    ?category=movie,book is any of the categories,
+    ?genre=drama,comedy any of the genres, with &genre_match=all every one
+    ?year_min= ?year_max= ?rating_min= ?rating_max= are inclusive ranges
+    ?search= full-text search in name and description, best matches first
     """
-    category = f.CharFilter(
-        field_name='category__slug', lookup_expr='icontains'
-    )
-    genre = f.CharFilter(
-        field_name='genre__slug', lookup_expr='icontains'
+    category = CharInFilter(field_name='category__slug', lookup_expr='in')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = f.ChoiceFilter(
+        choices=(('any', 'any'), ('all', 'all')), method='filter_genre_match'
     )
+    year_min = f.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = f.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = f.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = f.NumberFilter(field_name='rating', lookup_expr='lte')
+    search = f.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = ['category', 'genre', 'name', 'year']
+
+    def filter_genre(self, queryset, name, value):
+        """
+        A subquery on the genre_title table instead of a join,
+        so titles are not repeated and need no DISTINCT
+        """
+        slugs = {slug for slug in value if slug}
+        if not slugs:
+            return queryset
+        genre_titles = GenreTitle.objects.filter(genre__slug__in=slugs)
+        if self.form.cleaned_data.get('genre_match') == 'all':
+            genre_titles = genre_titles.values('title_id').annotate(
+                matched=Count('genre_id')
+            ).filter(matched=len(slugs))
+        return queryset.filter(id__in=genre_titles.values('title_id'))
+
+    def filter_genre_match(self, queryset, name, value):
+        # applied by filter_genre
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+def get_options():
+    return getattr(settings, 'MAIL_QUEUE', {})
+
+
+def enqueue_mail(subject, body, recipient, from_email=None):
+    """
+    Queues a message for deliver_mail, one INSERT, no mail server I/O
+    """
+    return OutboundEmail.objects.create(
+        subject=subject, body=body, recipient=recipient,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL
+    )
+
+
+def claim(batch_size, lease):
+    """
+    Due messages, pushed forward by the lease so that other workers
+    skip them. Rows locked by another worker are skipped on PostgreSQL
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(OutboundEmail.objects.select_for_update(
+            skip_locked=True
+        ).filter(
+            status=OutboundEmail.PENDING, send_after__lte=now
+        ).values_list('id', flat=True)[:batch_size])
+        OutboundEmail.objects.filter(id__in=ids).update(
+            send_after=now + timedelta(seconds=lease),
+            attempts=F('attempts') + 1
+        )
+    return list(OutboundEmail.objects.filter(id__in=ids))
+
+
+def send_chunk(messages):
+    """
+    Sends the messages over one mail server connection,
+    returns id -> error text for the ones that failed
+    """
+    errors = {}
+    try:
+        with get_connection() as connection:
+            for message in messages:
+                try:
+                    EmailMessage(
+                        message.subject, message.body, message.from_email,
+                        [message.recipient], connection=connection
+                    ).send()
+                except Exception as error:
+                    errors[message.id] = repr(error)
+    except Exception as error:
+        for message in messages:
+            errors.setdefault(message.id, repr(error))
+    return errors
+
+
+def retry_delay(attempts):
+    return get_options().get('RETRY_DELAY', 60) * 2 ** (attempts - 1)
+
+
+def deliver_batch(batch_size=None, workers=None, max_attempts=None):
+    """
+    Claims a batch of due messages and sends it with a pool of threads,
+    a mail server connection per thread. Failed messages are retried
+    with exponential backoff until max_attempts.
+    Returns the number of messages sent and failed
+    """
+    options = get_options()
+    batch_size = batch_size or options.get('BATCH_SIZE', 100)
+    workers = workers or options.get('WORKERS', 4)
+    max_attempts = max_attempts or options.get('MAX_ATTEMPTS', 5)
+    messages = claim(batch_size, options.get('LEASE', 300))
+    if not messages:
+        return 0, 0
+
+    chunks = [messages[start::workers] for start in range(workers)]
+    errors = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chunk_errors in executor.map(send_chunk, filter(None, chunks)):
+            errors.update(chunk_errors)
+
+    now = timezone.now()
+    OutboundEmail.objects.filter(
+        id__in=[message.id for message in messages
+                if message.id not in errors]
+    ).update(status=OutboundEmail.SENT, sent=now, last_error='')
+    failed = [message for message in messages if message.id in errors]
+    for message in failed:
+        message.last_error = errors[message.id]
+        if message.attempts >= max_attempts:
+            message.status = OutboundEmail.FAILED
+        else:
+            message.send_after = now + timedelta(
+                seconds=retry_delay(message.attempts)
+            )
+    OutboundEmail.objects.bulk_update(
+        failed, ('last_error', 'status', 'send_after')
+    )
+    return len(messages) - len(failed), len(failed)
@@ -0,0 +1,97 @@
+import time
+from datetime import datetime, timezone
+
+from api.rows import (CommentRowSerializer, ReviewRowSerializer,
+                      TitleRowSerializer)
+from django.core.management import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Comment, Review, Title
+
+from .benchmark import (add_seed_arguments, git_commit, seeded_database,
+                        write_report)
+
+
+class Command(BaseCommand):
+    """
+    Serializes the same titles, reviews and comments with the model
+    serializers and with the values() row serializers of api.rows
+    on the seeded benchmark database. Objects and rows are loaded
+    before timing, so only serialization is compared
+    """
+    help = 'Compares rows per second of model and values() serializers'
+
+    def add_arguments(self, parser):
+        add_seed_arguments(parser)
+        parser.add_argument('--rows', type=int, default=1000,
+                            help='Objects serialized per round')
+        parser.add_argument('--rounds', type=int, default=20)
+
+    def handle(self, *args, **options):
+        self.options = options
+        with seeded_database(options, self.stderr):
+            report = self.run()
+        write_report(report, options, self.stdout)
+
+    def run(self):
+        cases = (
+            ('titles', TitleRowSerializer, Title.objects.select_related(
+                'category'
+            ).prefetch_related('genre')),
+            ('reviews', ReviewRowSerializer,
+             Review.objects.select_related('author')),
+            ('comments', CommentRowSerializer,
+             Comment.objects.select_related('author')),
+        )
+        return {
+            'meta': {
+                'commit': git_commit(),
+                'created': datetime.now(timezone.utc).isoformat(),
+                'rows': self.options['rows'],
+                'rounds': self.options['rounds'],
+            },
+            'serializers': {
+                name: self.compare(name, row_serializer_class, queryset)
+                for name, row_serializer_class, queryset in cases
+            },
+        }
+
+    def time_rounds(self, serialize):
+        started = time.perf_counter()
+        for _ in range(self.options['rounds']):
+            data = serialize()
+        return time.perf_counter() - started, data
+
+    def compare(self, name, row_serializer_class, queryset):
+        queryset = queryset[:self.options['rows']]
+        row_serializer = row_serializer_class()
+        serializer_class = row_serializer.serializer_class
+        instances = list(queryset)
+        rows = list(queryset.prefetch_related(None).values(
+            *row_serializer.columns
+        ))
+        row_serializer.prepare(rows)
+
+        model_time, model_data = self.time_rounds(
+            lambda: serializer_class(instances, many=True).data
+        )
+        row_time, row_data = self.time_rounds(
+            lambda: row_serializer.represent(rows)
+        )
+        count = len(rows) * self.options['rounds']
+        result = {
+            'rows': len(rows),
+            'identical': (JSONRenderer().render(model_data)
+                          == JSONRenderer().render(row_data)),
+            'model_rows_per_s': round(count / model_time) if model_time
+            else None,
+            'values_rows_per_s': round(count / row_time) if row_time
+            else None,
+        }
+        result['speedup'] = round(model_time / row_time, 1) if (
+            row_time and model_time
+        ) else None
+        self.stderr.write(
+            f'{name}: {result["model_rows_per_s"]} -> '
+            f'{result["values_rows_per_s"]} rows/s, x{result["speedup"]}'
+        )
+        return result
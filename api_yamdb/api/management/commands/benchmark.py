@@ -0,0 +1,342 @@
+import asyncio
+import json
+import subprocess
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from api.utils import confirmation_code_generator, get_tokens_for_user
+from django.conf import settings
+from django.core.management import BaseCommand, call_command
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+Endpoint = namedtuple('Endpoint', 'name method path data headers')
+
+
+def percentile(ordered, fraction):
+    """
+    Linear interpolation between the closest ranks of a sorted list
+    """
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (
+        position - lower
+    )
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', 'HEAD'), capture_output=True,
+            text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def add_seed_arguments(parser):
+    parser.add_argument('--output', help='Write the JSON report here')
+    parser.add_argument('--keepdb', action='store_true',
+                        help='Keep and reuse the seeded test database')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--comments', type=int, default=5000)
+    parser.add_argument('--engine', choices=('batch', 'copy'),
+                        default='batch', help='filldb engine')
+
+
+@contextmanager
+def seeded_database(options, stderr):
+    """
+    Creates a test database next to the configured one, seeds it with
+    gendata unless --keepdb found it seeded, and drops it on exit
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=options['keepdb']
+    )
+    try:
+        if not (options['keepdb'] and Title.objects.exists()):
+            with tempfile.TemporaryDirectory() as path:
+                call_command(
+                    'gendata', output=path, load=True,
+                    engine=options['engine'], seed=options['seed'],
+                    titles=options['titles'], users=options['users'],
+                    reviews=options['reviews'], comments=options['comments'],
+                    verbosity=0, stdout=stderr, stderr=stderr
+                )
+        yield
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=options['keepdb']
+        )
+
+
+def write_report(report, options, stdout):
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if options['output']:
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            file.write(output)
+    stdout.write(output)
+
+
+class Command(BaseCommand):
+    """
+    Seeds a test database (created next to the configured one and dropped
+    afterwards) with gendata and times the API routes with the test client.
+    Every endpoint gets one query-counting request, then --requests timed
+    ones, sent by --concurrency clients at a time: threads through the WSGI
+    handler, or tasks through the ASGI handler with the async read views
+    (--interface asgi). The JSON report is meant to be compared across commits
+    """
+    help = 'Benchmarks API endpoints and reports latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=10,
+                            help='Untimed requests per endpoint')
+        parser.add_argument('--endpoints', nargs='*',
+                            help='Only run endpoints with these names')
+        add_seed_arguments(parser)
+        parser.add_argument('--no-response-cache', action='store_true',
+                            help='Time anonymous reads without the cache')
+        parser.add_argument('--interface', choices=('wsgi', 'asgi'),
+                            default='wsgi')
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Requests in flight at a time')
+
+    def handle(self, *args, **options):
+        self.options = options
+        with seeded_database(options, self.stderr), override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            API_RESPONSE_CACHE={
+                **settings.API_RESPONSE_CACHE,
+                'ENABLED': not options['no_response_cache'],
+            }
+        ):
+            report = self.run()
+        write_report(report, options, self.stdout)
+
+    def run(self):
+        endpoints = self.get_endpoints()
+        if self.options['endpoints']:
+            endpoints = [endpoint for endpoint in endpoints
+                         if endpoint.name in self.options['endpoints']]
+        return {
+            'meta': {
+                'commit': git_commit(),
+                'created': datetime.now(timezone.utc).isoformat(),
+                'database': connection.vendor,
+                'requests': self.options['requests'],
+                'response_cache': not self.options['no_response_cache'],
+                'interface': self.options['interface'],
+                'concurrency': self.options['concurrency'],
+                'dataset': {
+                    'titles': Title.objects.count(),
+                    'users': User.objects.count(),
+                    'reviews': Review.objects.count(),
+                    'comments': Comment.objects.count(),
+                },
+            },
+            'endpoints': {
+                endpoint.name: self.measure(endpoint)
+                for endpoint in endpoints
+            },
+        }
+
+    def request(self, client, endpoint, index):
+        data = endpoint.data(index) if endpoint.data else None
+        method = getattr(client, endpoint.method)
+        kwargs = {'content_type': 'application/json'} if data else {}
+        headers = endpoint.headers
+        if isinstance(client, AsyncClient):
+            # HTTP_AUTHORIZATION -> authorization header of the ASGI scope
+            headers = {name[5:].replace('_', '-').lower(): value
+                       for name, value in headers.items()}
+        return method(endpoint.path(index), data=data, **kwargs, **headers)
+
+    def measure(self, endpoint):
+        client = Client()
+        index = 0
+        with CaptureQueriesContext(connection) as queries:
+            response = self.request(client, endpoint, index)
+        query_count = len(queries)
+        for index in range(1, self.options['warmup'] + 1):
+            self.request(client, endpoint, index)
+
+        indexes = range(index + 1, index + 1 + self.options['requests'])
+        started = time.perf_counter()
+        if self.options['interface'] == 'asgi':
+            # queries were counted above: async reads use pool connections
+            with override_settings(ROOT_URLCONF='api_yamdb.async_urls'):
+                timings, errors = asyncio.run(
+                    self.run_async(endpoint, indexes)
+                )
+        else:
+            timings, errors = self.run_threads(endpoint, indexes)
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        result = {
+            'status': response.status_code,
+            'queries': query_count,
+            'requests': len(timings),
+            'errors': errors,
+            'throughput_rps': round(len(timings) / elapsed, 1)
+            if elapsed else None,
+            'mean_ms': round(sum(timings) / len(timings), 3)
+            if timings else None,
+        }
+        for name, fraction in (('p50', .5), ('p95', .95), ('p99', .99)):
+            value = percentile(timings, fraction)
+            result[f'{name}_ms'] = None if value is None else round(value, 3)
+        self.stderr.write(
+            f'{endpoint.name}: p50 {result["p50_ms"]} ms, '
+            f'p99 {result["p99_ms"]} ms, {result["queries"]} queries'
+        )
+        return result
+
+    def run_threads(self, endpoint, indexes):
+        """
+        --concurrency threads with a client each share the request indexes
+        """
+        pending = iter(indexes)
+        lock = threading.Lock()
+        timings, errors = [], [0]
+
+        def worker():
+            client = Client()
+            while True:
+                with lock:
+                    index = next(pending, None)
+                if index is None:
+                    return
+                begin = time.perf_counter()
+                response = self.request(client, endpoint, index)
+                with lock:
+                    timings.append((time.perf_counter() - begin) * 1000)
+                    errors[0] += response.status_code >= 400
+
+        def thread_worker():
+            try:
+                worker()
+            finally:
+                connections.close_all()
+
+        if self.options['concurrency'] <= 1:
+            worker()
+            return timings, errors[0]
+        threads = [threading.Thread(target=thread_worker)
+                   for _ in range(self.options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, errors[0]
+
+    async def run_async(self, endpoint, indexes):
+        """
+        --concurrency tasks with an ASGI client each share the request indexes
+        """
+        pending = iter(indexes)
+        timings, errors = [], [0]
+
+        async def worker():
+            client = AsyncClient()
+            for index in pending:
+                begin = time.perf_counter()
+                response = await self.request(client, endpoint, index)
+                timings.append((time.perf_counter() - begin) * 1000)
+                errors[0] += response.status_code >= 400
+
+        await asyncio.gather(*(
+            worker() for _ in range(max(self.options['concurrency'], 1))
+        ))
+        return timings, errors[0]
+
+    def get_endpoints(self):
+        title = Title.objects.order_by('-review_count', 'pk').first()
+        review = Review.objects.filter(pk=Comment.objects.values(
+            'review'
+        ).annotate(total=Count('pk')).order_by('-total').values(
+            'review'
+        )[:1]).first() or Review.objects.first()
+        genre = Genre.objects.first()
+        category = Category.objects.first()
+        user = User.objects.first()
+        confirmation_code = confirmation_code_generator.make_token(user)
+        auth = {
+            'HTTP_AUTHORIZATION':
+                f'Bearer {get_tokens_for_user(user)["access"]}'
+        }
+        run = datetime.now().strftime('%H%M%S%f')
+
+        def static(path):
+            return lambda index: path
+
+        def page(path):
+            return lambda index: f'{path}?page={index % 5 + 1}'
+
+        def signup_data(index):
+            return {
+                'username': f'bench{run}_{index}',
+                'email': f'bench{run}_{index}@yamdb.fake'
+            }
+
+        def token_data(index):
+            return {
+                'username': user.username,
+                'confirmation_code': confirmation_code
+            }
+
+        return [
+            Endpoint('titles_list', 'get', page('/api/v1/titles/'),
+                     None, {}),
+            Endpoint('titles_list_filtered', 'get', static(
+                f'/api/v1/titles/?genre={genre.slug}'
+                f'&category={category.slug}&year={title.year}'
+            ), None, {}),
+            Endpoint('titles_search', 'get', static(
+                f'/api/v1/titles/?search={title.name.split()[0]}'
+            ), None, {}),
+            Endpoint('titles_top', 'get', static(
+                f'/api/v1/titles/top/?genre={genre.slug}'
+            ), None, {}),
+            Endpoint('titles_detail', 'get',
+                     static(f'/api/v1/titles/{title.pk}/'), None, {}),
+            Endpoint('reviews_list', 'get',
+                     page(f'/api/v1/titles/{title.pk}/reviews/'), None, {}),
+            Endpoint('reviews_list_cursor', 'get', static(
+                f'/api/v1/titles/{title.pk}/reviews/?cursor='
+            ), None, {}),
+            Endpoint('comments_list', 'get', static(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.pk}'
+                '/comments/'
+            ), None, {}),
+            Endpoint('genres_list', 'get', static('/api/v1/genres/'),
+                     None, {}),
+            Endpoint('categories_list', 'get',
+                     static('/api/v1/categories/'), None, {}),
+            Endpoint('users_me', 'get', static('/api/v1/users/me/'),
+                     None, auth),
+            Endpoint('signup', 'post', static('/api/v1/auth/signup/'),
+                     signup_data, {}),
+            Endpoint('signup_existing', 'post', static('/api/v1/auth/signup/'),
+                     lambda index: {'username': user.username,
+                                    'email': user.email}, {}),
+            Endpoint('token', 'post', static('/api/v1/auth/token/'),
+                     token_data, {}),
+        ]
@@ -0,0 +1,37 @@
+import time
+
+from api.mail import deliver_batch
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    Drains the outbound mail queue (api.models.OutboundEmail)
+    in batches, polls for new mail unless --once is given
+    """
+    help = 'Sends queued emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            help='Messages claimed at a time')
+        parser.add_argument('--workers', type=int,
+                            help='Sending threads, one connection each')
+        parser.add_argument('--max-attempts', type=int,
+                            help='Attempts before a message is failed')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds between polls of an empty queue')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit when no mail is due')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_batch(
+                options['batch_size'], options['workers'],
+                options['max_attempts']
+            )
+            if sent or failed:
+                self.stdout.write(f'sent {sent}, failed {failed}')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
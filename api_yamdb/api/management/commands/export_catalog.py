@@ -0,0 +1,31 @@
+from api.export import RESOURCES, export
+from django.conf import settings
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    Writes all titles or reviews as JSON lines or CSV to a file
+    or stdout, chunk by chunk, like GET /api/v1/export/
+    """
+    help = 'Exports the catalog as JSON lines or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=tuple(RESOURCES))
+        parser.add_argument('--format', dest='file_format',
+                            choices=('jsonl', 'csv'), default='jsonl')
+        parser.add_argument('--output', help='Write here instead of stdout')
+        parser.add_argument('--chunk-size', type=int,
+                            default=settings.EXPORT_CHUNK_SIZE,
+                            help='Rows fetched at a time')
+
+    def handle(self, *args, **options):
+        texts = export(options['resource'], options['file_format'],
+                       options['chunk_size'])
+        if options['output'] is None:
+            for text in texts:
+                self.stdout.write(text, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as file:
+            file.writelines(texts)
@@ -1,115 +1,304 @@
-import contextlib
 import csv
-from datetime import datetime
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
 
-from django.core.management import BaseCommand
-from django.shortcuts import get_object_or_404
+from api.caching import CATALOG_SCOPE, invalidate
+from api.copy_loader import TABLES, copy_table
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models.sql import InsertQuery
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from reviews.leaderboard import rebuild_leaderboard
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import rebuild_ratings
 from users.models import User
 
+GenreTitle = Title.genre.through
 
-class Command(BaseCommand):
+
+def insert_rows(model, objects, batch_size):
     """
-    Reads csv files, creates objects from data, very basic
+    INSERT ... ON CONFLICT DO NOTHING of the objects' own values.
+    Unlike bulk_create it is a raw insert like loaddata's, pre_save
+    does not run, so auto_now_add keeps pub_date of the dump.
+    auto_now and auto_now_add fields without a value get the load time
     """
-    def handle(self, *args, **options):
+    fields = model._meta.concrete_fields
+    now = timezone.now()
+    for field in fields:
+        if getattr(field, 'auto_now', False) or getattr(
+            field, 'auto_now_add', False
+        ):
+            for obj in objects:
+                if getattr(obj, field.attname) is None:
+                    setattr(obj, field.attname, now)
+    size = min(
+        batch_size,
+        connection.ops.bulk_batch_size(fields, objects) or len(objects)
+    )
+    for start in range(0, len(objects), size):
+        query = InsertQuery(model, ignore_conflicts=True)
+        query.insert_values(fields, objects[start:start + size], raw=True)
+        query.get_compiler(connection=connection).execute_sql()
 
-        p = 'static/data/'
 
-        with contextlib.ExitStack() as stack:
-            categories = csv.DictReader(
-                stack.enter_context(open(f'{p}category.csv', 'r'))
-            )
-            genres = csv.DictReader(
-                stack.enter_context(open(f'{p}genre.csv', 'r'))
-            )
-            titles = csv.DictReader(
-                stack.enter_context(open(f'{p}titles.csv', 'r'))
+def copy_table_in_worker(*args):
+    try:
+        return copy_table(*args)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    """
+    Streams csv files into the database in batches,
+    foreign keys are checked against in-memory id sets
+    instead of a query per row.
+    On PostgreSQL --engine=copy loads the files with COPY FROM STDIN,
+    independent tables in parallel worker processes
+    """
+    help = 'Loads csv dumps (static/data/ by default) into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='static/data/',
+            help='Directory with the csv files'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows per INSERT statement'
+        )
+        parser.add_argument(
+            '--truncate', action='store_true',
+            help='Empty the loaded tables before loading'
+        )
+        parser.add_argument(
+            '--engine', choices=('batch', 'copy'), default='batch',
+            help=(
+                'batch: bulk_create, skips existing rows; '
+                'copy: PostgreSQL COPY, expects empty tables '
+                'and a consistent dump'
             )
-            genre_title = csv.DictReader(
-                stack.enter_context(open(f'{p}genre_title.csv', 'r'))
+        )
+        parser.add_argument(
+            '--workers', type=int, default=min(4, os.cpu_count() or 1),
+            help='Worker processes for the copy engine'
+        )
+
+    def get_tables(self):
+        """
+        (file name, model, row converter) in foreign key dependency order
+        """
+        return (
+            ('category.csv', Category, self.build_category),
+            ('genre.csv', Genre, self.build_genre),
+            ('titles.csv', Title, self.build_title),
+            ('genre_title.csv', GenreTitle, self.build_genre_title),
+            ('users.csv', User, self.build_user),
+            ('review.csv', Review, self.build_review),
+            ('comments.csv', Comment, self.build_comment),
+        )
+
+    def handle(self, *args, **options):
+        self.ids = {}
+        tables = self.get_tables()
+        models = [model for _, model, _ in tables]
+        if options['truncate']:
+            self.truncate(models)
+        engine = options['engine']
+        if engine == 'copy' and connection.vendor != 'postgresql':
+            self.stderr.write(
+                'COPY is only available on PostgreSQL, '
+                'falling back to batched inserts'
             )
-            users = csv.DictReader(
-                stack.enter_context(open(f'{p}users.csv', 'r'))
+            engine = 'batch'
+        if engine == 'copy':
+            self.copy_all(
+                options['path'], options['batch_size'], options['workers']
             )
-            reviews = csv.DictReader(
-                stack.enter_context(open(f'{p}review.csv', 'r'))
+        else:
+            for filename, model, build in tables:
+                self.load(
+                    os.path.join(options['path'], filename),
+                    model, build, options['batch_size']
+                )
+        self.reset_sequences(models)
+        rebuild_ratings()
+        rebuild_leaderboard()
+        invalidate(CATALOG_SCOPE)
+
+    def copy_all(self, path, chunk_size, workers):
+        """
+        Starts every table as soon as the tables it references are committed
+        """
+        pending = {filename: (label, set(deps))
+                   for filename, label, deps in TABLES}
+        # forked workers must open their own database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            running = {}
+            while pending or running:
+                for filename, (label, deps) in list(pending.items()):
+                    if deps:
+                        continue
+                    del pending[filename]
+                    future = pool.submit(
+                        copy_table_in_worker,
+                        path, filename, label, chunk_size
+                    )
+                    running[future] = filename
+                if not running:
+                    raise CommandError(
+                        f'Unresolvable table dependencies: {pending}'
+                    )
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    filename = running.pop(future)
+                    self.stdout.write(
+                        f'{filename}: {future.result()} rows copied'
+                    )
+                    for _, deps in pending.values():
+                        deps.discard(filename)
+
+    def truncate(self, models):
+        tables = [model._meta.db_table for model in models]
+        sql_list = connection.ops.sql_flush(
+            no_style(), tables, allow_cascade=True
+        )
+        connection.ops.execute_sql_flush(sql_list)
+        self.stdout.write(f'Truncated {", ".join(tables)}')
+
+    def reset_sequences(self, models):
+        sql_list = connection.ops.sequence_reset_sql(no_style(), models)
+        if sql_list:
+            with connection.cursor() as cursor:
+                for sql in sql_list:
+                    cursor.execute(sql)
+
+    def known_ids(self, model):
+        """
+        Ids of rows already in the table, extended as batches are loaded
+        """
+        if model not in self.ids:
+            self.ids[model] = set(
+                model.objects.values_list('pk', flat=True).iterator()
             )
-            comments = csv.DictReader(
-                stack.enter_context(open(f'{p}comments.csv', 'r'))
+        return self.ids[model]
+
+    def load(self, path, model, build, batch_size):
+        loaded = present = conflicts = skipped = 0
+        known = self.known_ids(model)
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            rows = csv.DictReader(file)
+            with transaction.atomic():
+                while True:
+                    chunk = list(islice(rows, batch_size))
+                    if not chunk:
+                        break
+                    objects = [obj for obj in map(build, chunk) if obj]
+                    skipped += len(chunk) - len(objects)
+                    new = [obj for obj in objects if obj.pk not in known]
+                    present += len(objects) - len(new)
+                    inserted = self.insert(model, new, batch_size)
+                    known.update(inserted)
+                    loaded += len(inserted)
+                    conflicts += len(new) - len(inserted)
+                    self.report_progress(model, loaded)
+        self.stdout.write(
+            f'{model._meta.db_table}: {loaded} rows loaded, '
+            f'{present} already present, {conflicts} conflicting, '
+            f'{skipped} skipped (unknown references)'
+        )
+
+    def insert(self, model, objects, batch_size):
+        """
+        Inserts the objects skipping rows that violate a unique constraint,
+        returns the ids of the rows that were actually inserted
+        """
+        if not objects:
+            return set()
+        insert_rows(model, objects, batch_size)
+        pks = [obj.pk for obj in objects]
+        size = connection.ops.bulk_batch_size(['pk'], pks) or len(pks)
+        inserted = set()
+        for start in range(0, len(pks), size):
+            inserted.update(model.objects.filter(
+                pk__in=pks[start:start + size]
+            ).values_list('pk', flat=True))
+        return inserted
+
+    def report_progress(self, model, loaded):
+        if self.stdout.isatty():
+            self.stdout.write(
+                f'{model._meta.db_table}: {loaded} rows', ending='\r'
             )
+            self.stdout.flush()
 
-            for row in categories:
-                Category.objects.get_or_create(
-                    id=int(row['id']),
-                    name=row['name'],
-                    slug=row['slug']
-                )
+    def has(self, model, pk):
+        return pk in self.known_ids(model)
 
-            for row in genres:
-                Genre.objects.get_or_create(
-                    id=int(row['id']),
-                    name=row['name'],
-                    slug=row['slug']
-                )
+    def build_category(self, row):
+        return Category(id=int(row['id']), name=row['name'], slug=row['slug'])
 
-            for row in titles:
-                Title.objects.get_or_create(
-                    id=int(row['id']),
-                    name=row['name'],
-                    year=int(row['year']),
-                    category=get_object_or_404(
-                        Category,
-                        id=int(row['category'])
-                    )
-                )
+    def build_genre(self, row):
+        return Genre(id=int(row['id']), name=row['name'], slug=row['slug'])
 
-            for row in genre_title:
-                title = get_object_or_404(
-                    Title,
-                    id=int(row['title_id'])
-                )
-                genre = get_object_or_404(
-                    Genre,
-                    id=int(row['genre_id'])
-                )
-                title.genre.add(genre)
-            for row in users:
-                User.objects.get_or_create(
-                    id=int(row['id']),
-                    username=row['username'],
-                    email=row['email'],
-                    role=row['role'],
-                    bio=row['bio'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name']
-                )
+    def build_title(self, row):
+        category_id = int(row['category']) if row['category'] else None
+        if category_id is not None and not self.has(Category, category_id):
+            return None
+        return Title(
+            id=int(row['id']),
+            name=row['name'],
+            year=int(row['year']),
+            description=row.get('description', ''),
+            category_id=category_id
+        )
 
-            for row in reviews:
-                Review.objects.get_or_create(
-                    id=int(row['id']),
-                    title_id=int(row['title_id']),
-                    text=row['text'],
-                    author=get_object_or_404(
-                        User,
-                        id=int(row['author'])),
-                    score=int(row['score']),
-                    pub_date=datetime.strptime(
-                        row['pub_date'], "%Y-%m-%dT%H:%M:%S.%fZ"
-                    )
-                )
+    def build_genre_title(self, row):
+        title_id, genre_id = int(row['title_id']), int(row['genre_id'])
+        if not (self.has(Title, title_id) and self.has(Genre, genre_id)):
+            return None
+        return GenreTitle(id=int(row['id']), title_id=title_id,
+                          genre_id=genre_id)
 
-            for row in comments:
-                Comment.objects.get_or_create(
-                    id=int(row['id']),
-                    review=get_object_or_404(
-                        Review,
-                        id=int(row['review_id'])),
-                    author=get_object_or_404(
-                        User,
-                        id=int(row['author'])),
-                    text=row['text'],
-                    pub_date=datetime.strptime(
-                        row['pub_date'], "%Y-%m-%dT%H:%M:%S.%fZ"
-                    )
-                )
+    def build_user(self, row):
+        return User(
+            id=int(row['id']),
+            username=row['username'],
+            email=row['email'],
+            role=row['role'],
+            bio=row['bio'],
+            first_name=row['first_name'],
+            last_name=row['last_name']
+        )
+
+    def build_review(self, row):
+        title_id, author_id = int(row['title_id']), int(row['author'])
+        if not (self.has(Title, title_id) and self.has(User, author_id)):
+            return None
+        return Review(
+            id=int(row['id']),
+            title_id=title_id,
+            author_id=author_id,
+            text=row['text'],
+            score=int(row['score']),
+            pub_date=parse_datetime(row['pub_date'])
+        )
+
+    def build_comment(self, row):
+        review_id, author_id = int(row['review_id']), int(row['author'])
+        if not (self.has(Review, review_id) and self.has(User, author_id)):
+            return None
+        return Comment(
+            id=int(row['id']),
+            review_id=review_id,
+            author_id=author_id,
+            text=row['text'],
+            pub_date=parse_datetime(row['pub_date'])
+        )
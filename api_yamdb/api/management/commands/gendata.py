@@ -0,0 +1,189 @@
+import csv
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.core.management import BaseCommand, CommandError, call_command
+
+WORDS = (
+    'фильм книга песня сюжет герой финал автор жанр сцена роль голос '
+    'история время мир любовь война дорога город море ночь свет тьма '
+    'смех слёзы музыка ритм слово страница глава актёр режиссёр кадр'
+).split()
+FIRST_DATE = datetime(2010, 1, 1, tzinfo=timezone.utc)
+# fixed, so the output does not change with the current date
+LAST_YEAR = 2020
+
+
+def text(rng, min_words, max_words):
+    return ' '.join(
+        rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))
+    ).capitalize()
+
+
+def pub_date(rng, index):
+    """
+    Grows with the row index, so ids and dates have the same order
+    """
+    moment = FIRST_DATE + timedelta(
+        seconds=index, milliseconds=rng.randint(0, 999)
+    )
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class Command(BaseCommand):
+    """
+    Writes a reproducible synthetic dataset in the csv schema filldb reads.
+    Rows are generated and written one by one, memory use
+    does not depend on the dataset size.
+    Review k belongs to title k % titles and its author is derived from
+    k // titles, so (title, author) stays unique without remembering pairs
+    """
+    help = 'Generates a seeded synthetic dataset for scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='generated_data/',
+                            help='Directory to write the csv files to')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--max-genres-per-title', type=int, default=3)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument(
+            '--load', action='store_true',
+            help='Load the generated files with filldb --truncate'
+        )
+        parser.add_argument(
+            '--engine', choices=('batch', 'copy'), default='batch',
+            help='filldb engine used with --load'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.seed = options['seed']
+        if options['reviews'] > options['titles'] * options['users']:
+            raise CommandError(
+                'Every user can review a title only once, '
+                'reviews must not exceed titles * users'
+            )
+        if min(options['categories'], options['genres'], options['titles'],
+               options['users']) < 1:
+            raise CommandError(
+                'categories, genres, titles and users must be positive'
+            )
+        if options['comments'] and not options['reviews']:
+            raise CommandError('comments need reviews')
+        os.makedirs(options['output'], exist_ok=True)
+
+        self.write('category.csv', ('id', 'name', 'slug'),
+                   self.categories())
+        self.write('genre.csv', ('id', 'name', 'slug'), self.genres())
+        self.write('titles.csv',
+                   ('id', 'name', 'year', 'category', 'description'),
+                   self.titles())
+        self.write('genre_title.csv', ('id', 'title_id', 'genre_id'),
+                   self.genre_titles())
+        self.write('users.csv',
+                   ('id', 'username', 'email', 'role', 'bio',
+                    'first_name', 'last_name'),
+                   self.users())
+        self.write('review.csv',
+                   ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+                   self.reviews())
+        self.write('comments.csv',
+                   ('id', 'review_id', 'text', 'author', 'pub_date'),
+                   self.comments())
+
+        if options['load']:
+            call_command(
+                'filldb', path=options['output'], truncate=True,
+                engine=options['engine'], stdout=self.stdout,
+                stderr=self.stderr
+            )
+
+    def rng(self, table):
+        """
+        Separate generator per table: changing the size of one table
+        does not change the contents of the others
+        """
+        return random.Random(f'{self.seed}:{table}')
+
+    def write(self, filename, header, rows):
+        written = 0
+        path = os.path.join(self.options['output'], filename)
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            for row in rows:
+                writer.writerow(row)
+                written += 1
+        self.stdout.write(f'{filename}: {written} rows')
+
+    def categories(self):
+        for pk in range(1, self.options['categories'] + 1):
+            yield pk, f'Категория {pk}', f'category-{pk}'
+
+    def genres(self):
+        for pk in range(1, self.options['genres'] + 1):
+            yield pk, f'Жанр {pk}', f'genre-{pk}'
+
+    def titles(self):
+        rng = self.rng('titles')
+        for pk in range(1, self.options['titles'] + 1):
+            yield (
+                pk,
+                text(rng, 1, 4),
+                rng.randint(1900, LAST_YEAR),
+                rng.randint(1, self.options['categories']),
+                text(rng, 5, 40)
+            )
+
+    def genre_titles(self):
+        rng = self.rng('genre_title')
+        genres = range(1, self.options['genres'] + 1)
+        most = min(self.options['max_genres_per_title'], len(genres))
+        pk = 0
+        for title_id in range(1, self.options['titles'] + 1):
+            for genre_id in sorted(rng.sample(genres, rng.randint(1, most))):
+                pk += 1
+                yield pk, title_id, genre_id
+
+    def users(self):
+        rng = self.rng('users')
+        for pk in range(1, self.options['users'] + 1):
+            role = rng.choices(
+                ('user', 'moderator', 'admin'), weights=(97, 2, 1)
+            )[0]
+            yield (pk, f'user{pk}', f'user{pk}@yamdb.fake', role,
+                   '', '', '')
+
+    def reviews(self):
+        rng = self.rng('reviews')
+        titles, users = self.options['titles'], self.options['users']
+        for index in range(self.options['reviews']):
+            title_index, round_number = index % titles, index // titles
+            # offset by title so authors are spread over all users
+            author = (title_index * 7919 + round_number) % users
+            yield (
+                index + 1,
+                title_index + 1,
+                text(rng, 3, 60),
+                author + 1,
+                rng.randint(1, 10),
+                pub_date(rng, index)
+            )
+
+    def comments(self):
+        rng = self.rng('comments')
+        reviews, users = self.options['reviews'], self.options['users']
+        for index in range(self.options['comments']):
+            yield (
+                index + 1,
+                rng.randint(1, reviews),
+                text(rng, 2, 30),
+                rng.randint(1, users),
+                pub_date(rng, index)
+            )
@@ -0,0 +1,21 @@
+from api.caching import CATALOG_SCOPE, invalidate
+from django.core.management import BaseCommand
+from reviews.leaderboard import rebuild_leaderboard
+from reviews.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    """
+    Recalculates rating, review sum, review count and score distribution
+    of every title from scratch, e.g. after bulk imports that bypass
+    model signals, then the leaderboard and its prior
+    """
+    help = 'Rebuilds denormalized title ratings from reviews'
+
+    def handle(self, *args, **options):
+        updated = rebuild_ratings()
+        ranked = rebuild_leaderboard()
+        invalidate(CATALOG_SCOPE)
+        self.stdout.write(
+            f'Rebuilt ratings of {updated} titles, ranked {ranked} titles'
+        )
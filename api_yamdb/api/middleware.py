@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.permissions import SAFE_METHODS
+
+from .authentication import token_user_id
+from .routers import replica_alias
+from .timing import current_timings, install_query_recorder
+
+logger = logging.getLogger('api.server_timing')
+
+
+class AsyncCapableMiddleware:
+    """
+    Runs in the mode of the handler chain, call() under WSGI and
+    acall() under ASGI, so Django does not adapt the chain around it
+    to the single thread of sync code
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # like MiddlewareMixin: the middleware above sees
+            # a coroutine function
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        return self.call(request)
+
+    def call(self, request):
+        raise NotImplementedError
+
+    async def acall(self, request):
+        raise NotImplementedError
+
+
+class ServerTimingMiddleware(AsyncCapableMiddleware):
+    """
+    For a sampled share of requests measures SQL query count and time,
+    serializer time and view time, reports them in the Server-Timing
+    header and as a JSON log line.
+    Queries are recorded by api.timing.record_query on every connection,
+    also the ones of the threads views run in under ASGI.
+    Enabled by SERVER_TIMING['ENABLED'], SERVER_TIMING['SAMPLE_RATE']
+    is the share of requests to measure
+    """
+
+    def __init__(self, get_response):
+        options = getattr(settings, 'SERVER_TIMING', {})
+        if not options.get('ENABLED'):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.sample_rate = options.get('SAMPLE_RATE', 1.0)
+        connection_created.connect(install_query_recorder)
+
+    def call(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        # connections opened before the receiver was connected
+        for connection in connections.all():
+            install_query_recorder(connection)
+        timings = {'db': 0, 'queries': 0}
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timings['view'] = time.perf_counter() - started
+            current_timings.reset(token)
+        return self.report(request, response, timings)
+
+    async def acall(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+        timings = {'db': 0, 'queries': 0}
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timings['view'] = time.perf_counter() - started
+            current_timings.reset(token)
+        return self.report(request, response, timings)
+
+    def report(self, request, response, timings):
+        queries = timings.pop('queries')
+        metrics = {name: round(seconds * 1000, 3)
+                   for name, seconds in timings.items()}
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration}' + (
+                f';desc="{queries} queries"' if name == 'db' else ''
+            )
+            for name, duration in sorted(metrics.items())
+        )
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': queries,
+            **{f'{name}_ms': duration for name, duration in metrics.items()},
+        }))
+        return response
+
+
+def primary_key(user_id):
+    return f'db:read-primary:{user_id}'
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """
+    Reads of GET, HEAD and OPTIONS requests go to a random replica
+    of DATABASE_REPLICAS (through api.routers.ReplicaRouter), other
+    requests read the primary. A user who has written reads the primary
+    for DB_READ_PRIMARY_AFTER_WRITE seconds, so replication lag does
+    not hide their own writes from them.
+    The replica is set in the request's context, the threads views run in
+    under ASGI get a copy of it
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def route(self, request):
+        """
+        (user id of the request's token, replica to read or None)
+        """
+        user_id = token_user_id(request)
+        if request.method not in SAFE_METHODS:
+            return user_id, None
+        if user_id is not None and cache.get(primary_key(user_id)):
+            return user_id, None
+        return user_id, random.choice(settings.DATABASE_REPLICAS)
+
+    def remember_write(self, request, user_id, response):
+        if (request.method not in SAFE_METHODS and user_id is not None
+                and response.status_code < 400):
+            cache.set(
+                primary_key(user_id), True,
+                settings.DB_READ_PRIMARY_AFTER_WRITE
+            )
+
+    def call(self, request):
+        user_id, alias = self.route(request)
+        token = replica_alias.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_alias.reset(token)
+        self.remember_write(request, user_id, response)
+        return response
+
+    async def acall(self, request):
+        # the cache may be a network round trip, off the event loop
+        user_id, alias = await sync_to_async(
+            self.route, thread_sensitive=False
+        )(request)
+        token = replica_alias.set(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_alias.reset(token)
+        await sync_to_async(
+            self.remember_write, thread_sensitive=False
+        )(request, user_id, response)
+        return response
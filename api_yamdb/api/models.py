@@ -0,0 +1,55 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """
+    Mail queued by requests, delivered by the deliver_mail command
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    STATUSES = (
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255, verbose_name='Subject')
+    body = models.TextField(verbose_name='Body')
+    from_email = models.CharField(max_length=254, verbose_name='Sender')
+    recipient = models.EmailField(max_length=254, verbose_name='Recipient')
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING,
+        verbose_name='Status'
+    )
+    # next attempt, a claimed message is pushed forward by the lease,
+    # so mail of a worker that died is picked up again
+    send_after = models.DateTimeField(
+        default=timezone.now, verbose_name='Send after'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Attempts'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Last error')
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='Created'
+    )
+    sent = models.DateTimeField(
+        null=True, blank=True, verbose_name='Sent'
+    )
+
+    class Meta:
+        ordering = ['send_after']
+        verbose_name = 'Outbound email'
+        verbose_name_plural = 'Outbound emails'
+        indexes = [
+            models.Index(
+                fields=['status', 'send_after'],
+                name='outbound_email_due_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -20,6 +20,12 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return False
 
 
+class IsAdmin(permissions.BasePermission):
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.is_admin
+
+
 class IsAdminOrModeratorOrAuthorOrReadOnly(permissions.BasePermission):
     """
     user only has object permission if admin, moderator or author of object
@@ -34,4 +40,4 @@ class IsAdminOrModeratorOrAuthorOrReadOnly(permissions.BasePermission):
             return True
         return (request.user.is_admin
                 or request.user.is_moderator
-                or obj.author == request.user)
+                or obj.author_id == request.user.id)
@@ -0,0 +1,41 @@
+import contextlib
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# replica the current request reads from, None reads the primary
+replica_alias = ContextVar('replica_alias', default=None)
+
+
+@contextlib.contextmanager
+def reading_primary():
+    """
+    Reads in the block go to the primary whatever the request picked
+    """
+    token = replica_alias.set(None)
+    try:
+        yield
+    finally:
+        replica_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica picked for the current request
+    (see api.middleware.ReplicaRoutingMiddleware), writes and reads
+    outside of such requests to the primary 'default' database.
+    Replicas hold the same data, relations between them are allowed
+    and only the primary is migrated
+    """
+
+    def db_for_read(self, model, **hints):
+        return replica_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,131 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+from reviews.models import Genre
+
+from .serializers import CommentSerializer, ReviewSerializer, TitleSerializer
+from .timing import measure
+
+
+class RowSerializer:
+    """
+    Read-only counterpart of a ModelSerializer for list pages:
+    builds the same dicts from values() rows, with no serializer
+    or field calls per object. Keys follow the field order
+    of serializer_class, so the rendered JSON is the same byte for byte
+    """
+    serializer_class = None
+    # serializer field -> values() column, the field name by default
+    sources = {}
+    # loaded whatever fields are requested
+    extra_columns = ()
+
+    def __init__(self, fields=None):
+        declared = self.serializer_class().fields
+        readers = {
+            name: self.get_reader(name, field)
+            for name, field in declared.items()
+            if fields is None or name in fields
+        }
+        self.readers = [(name, read) for name, (_, read) in readers.items()]
+        self.columns = list(dict.fromkeys(
+            [column for columns, _ in readers.values() for column in columns]
+            + list(self.extra_columns)
+        ))
+
+    def get_reader(self, name, field):
+        """
+        (values() columns, function of a row) for a serializer field
+        """
+        column = self.sources.get(name, name)
+        value = itemgetter(column)
+        if isinstance(field, (serializers.DateTimeField,
+                              serializers.FloatField)):
+            # isoformat with the time zone and 'Z', float()
+            convert = field.to_representation
+            return (column,), lambda row: (
+                None if value(row) is None else convert(value(row))
+            )
+        return (column,), value
+
+    def prepare(self, rows):
+        """
+        Loads whatever the rows refer to, called once per page
+        """
+
+    def represent(self, rows):
+        return [{name: read(row) for name, read in self.readers}
+                for row in rows]
+
+    def many(self, rows):
+        with measure('serializer'):
+            self.prepare(rows)
+            return self.represent(rows)
+
+
+class TitleRowSerializer(RowSerializer):
+    """
+    Category comes from the joined columns, genres of the page
+    from one query, ordered like the genre prefetch
+    """
+    serializer_class = TitleSerializer
+
+    def get_reader(self, name, field):
+        if name == 'category':
+            return ('category__name', 'category__slug'), lambda row: (
+                None if row['category__slug'] is None else {
+                    'name': row['category__name'],
+                    'slug': row['category__slug'],
+                }
+            )
+        if name == 'genre':
+            return ('id',), lambda row: self.genres[row['id']]
+        return super().get_reader(name, field)
+
+    def prepare(self, rows):
+        self.genres = defaultdict(list)
+        if 'genre' not in dict(self.readers):
+            return
+        for title_id, name, slug in Genre.objects.filter(
+            titles__in=[row['id'] for row in rows]
+        ).values_list('titles', 'name', 'slug'):
+            self.genres[title_id].append({'name': name, 'slug': slug})
+
+
+class ReviewRowSerializer(RowSerializer):
+    serializer_class = ReviewSerializer
+    sources = {'author': 'author__username'}
+    # keyset cursors are built from them
+    extra_columns = ('id', 'pub_date')
+
+
+class CommentRowSerializer(RowSerializer):
+    serializer_class = CommentSerializer
+    sources = {'author': 'author__username'}
+    extra_columns = ('id', 'pub_date')
+
+
+class RowListMixin:
+    """
+    list() pages values() rows through row_serializer_class
+    instead of model instances through the serializer,
+    unless settings.ROW_LIST_SERIALIZERS is off
+    """
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if not settings.ROW_LIST_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+        serializer = self.row_serializer_class(
+            self.get_serializer_context().get('fields')
+        )
+        queryset = self.filter_queryset(
+            self.get_queryset()
+        ).prefetch_related(None).values(*serializer.columns)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(serializer.many(list(queryset)))
+        return self.get_paginated_response(serializer.many(page))
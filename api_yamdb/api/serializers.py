@@ -1,40 +1,58 @@
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db import connection, transaction
 from rest_framework import serializers
-from rest_framework.exceptions import ValidationError
-from reviews.models import Category, Comment, Genre, Review, Title
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.settings import api_settings
+from reviews.leaderboard import sync_title_ranks
+from reviews.models import (SCORE_FIELDS, Category, Comment, Genre, Review,
+                            Title, TitleRank)
 from users.models import User
 
+from .caching import invalidate
+from .fieldsets import SparseFieldsSerializerMixin
+from .timing import TimedSerializerMixin
+from .utils import confirmation_code_generator
 from .validators import validate_username
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Genre
         exclude = ['id']
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Category
         exclude = ['id']
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     """
     Displays genre and category as dictionaries with name and slug
     """
 
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = serializers.FloatField(required=False)
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('review_sum', 'review_count', 'modified', *SCORE_FIELDS)
         model = Title
 
 
+class TitleDetailSerializer(TitleSerializer):
+    """
+    Adds the number of reviews per score, kept in counter columns
+    """
+    score_distribution = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+
 class TitleSerializerWithSlugFields(TitleSerializer):
     """
     Serializer for unsafe methods, serializes category and genre from slugs
@@ -50,7 +68,122 @@ class TitleSerializerWithSlugFields(TitleSerializer):
     )
 
 
-class SignUpSerializer(serializers.ModelSerializer):
+class TitleRankSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    A title on the leaderboard, with its Bayesian score
+    """
+    id = serializers.IntegerField(source='title_id')
+    name = serializers.CharField(source='title.name')
+    year = serializers.IntegerField(source='title.year')
+    category = CategorySerializer()
+    rating = serializers.FloatField(source='title.rating')
+
+    class Meta:
+        model = TitleRank
+        fields = ('id', 'name', 'year', 'category', 'rating',
+                  'review_count', 'score')
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of /titles/top/
+    """
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+    limit = serializers.IntegerField(min_value=1, default=10)
+
+    def validate_limit(self, value):
+        if value > settings.LEADERBOARD_MAX_SIZE:
+            raise ValidationError(
+                f'Не больше {settings.LEADERBOARD_MAX_SIZE} произведений'
+            )
+        return value
+
+
+class TitleBatchSerializer(serializers.ListSerializer):
+    """
+    Creates titles in one transaction: category and genre slugs
+    of the whole batch are resolved with a query each,
+    titles and their genre_title rows are inserted in bulk.
+    Errors are reported per item, in the order of the items
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            limit = settings.TITLE_BATCH_MAX_SIZE
+            if len(data) > limit:
+                raise ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        f'Не больше {limit} произведений за запрос'
+                    ]
+                })
+            items = [item for item in data if isinstance(item, dict)]
+            self.categories = Category.objects.in_bulk(
+                {str(item.get('category')) for item in items},
+                field_name='slug'
+            )
+            self.genres = Genre.objects.in_bulk({
+                str(slug) for item in items
+                if isinstance(item.get('genre'), list)
+                for slug in item['genre']
+            }, field_name='slug')
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        titles = [
+            Title(category=item['category'], **{
+                name: value for name, value in item.items()
+                if name not in ('category', 'genre')
+            })
+            for item in validated_data
+        ]
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                Title.objects.bulk_create(titles)
+            else:
+                # no ids back from a bulk insert, needed for genre_title
+                for title in titles:
+                    title.save()
+            Title.genre.through.objects.bulk_create(
+                Title.genre.through(title_id=title.id, genre_id=genre.id)
+                for title, item in zip(titles, validated_data)
+                for genre in item['genre']
+            )
+        # bulk inserts send no post_save / m2m_changed for the signals
+        sync_title_ranks(title.id for title in titles)
+        invalidate('titles')
+        return titles
+
+
+class TitleBatchItemSerializer(TimedSerializerMixin,
+                               serializers.ModelSerializer):
+    """
+    Item of a batch, category and genre are slugs
+    """
+    category = serializers.CharField()
+    genre = serializers.ListField(child=serializers.CharField())
+
+    class Meta:
+        model = Title
+        fields = ('name', 'year', 'description', 'category', 'genre')
+        list_serializer_class = TitleBatchSerializer
+
+    def validate_category(self, value):
+        category = self.parent.categories.get(value)
+        if category is None:
+            raise ValidationError(f'Категория {value} не найдена')
+        return category
+
+    def validate_genre(self, value):
+        missing = [slug for slug in value if slug not in self.parent.genres]
+        if missing:
+            raise ValidationError(f'Жанры не найдены: {", ".join(missing)}')
+        # a repeated slug would break the unique (title, genre) pair
+        return list({slug: self.parent.genres[slug]
+                     for slug in value}.values())
+
+
+class SignUpSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     validates username against standard unicode regex and checks its not 'me'
     """
@@ -63,9 +196,10 @@ class SignUpSerializer(serializers.ModelSerializer):
         fields = ('email', 'username')
 
 
-class GetTokenSerializer(serializers.ModelSerializer):
+class GetTokenSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
-    Checks confirmation code against user's hidden field
+    Checks confirmation code, the user is looked up once
+    and passed on in validated_data
     """
     username = serializers.CharField(
         required=True,
@@ -83,13 +217,18 @@ class GetTokenSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, data):
-        user = get_object_or_404(User, username=data['username'])
-        if data['confirmation_code'] != user.confirmation_code:
+        user = User.objects.matching(username=data['username']).first()
+        if user is None:
+            raise NotFound('Пользователь не найден')
+        if not confirmation_code_generator.check_token(
+            user, data['confirmation_code']
+        ):
             raise ValidationError('Неверный код подтверждения')
+        data['user'] = user
         return data
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for UserViewSet
     """
@@ -102,8 +241,32 @@ class UserSerializer(serializers.ModelSerializer):
             'bio', 'role'
         ]
 
+    def check_unique(self, message, **lookup):
+        """
+        The LOWER() unique indexes reject names and emails that differ
+        only in case, the model's own unique check does not
+        """
+        users = User.objects.matching(**lookup)
+        if self.instance is not None:
+            users = users.exclude(pk=self.instance.pk)
+        if users.exists():
+            raise ValidationError(message)
+
+    def validate_username(self, value):
+        self.check_unique(
+            'Пользователь c таким именем уже зарегестрирован', username=value
+        )
+        return value
+
+    def validate_email(self, value):
+        self.check_unique(
+            'Пользователь с такой почтой уже зарегестрирован', email=value
+        )
+        return value
 
-class ReviewSerializer(serializers.ModelSerializer):
+
+class ReviewSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     """
     Checks the author to write only one review for one title.
     """
@@ -119,18 +282,19 @@ class ReviewSerializer(serializers.ModelSerializer):
         author = self.context['request'].user
         if not self.context['request'].method == 'PATCH':
             if Review.objects.filter(title__id=title_id,
-                                     author=author).exists():
+                                     author_id=author.id).exists():
                 raise serializers.ValidationError(
                     'You can write only one review!'
                 )
         return data
 
     class Meta:
-        fields = '__all__'
+        exclude = ('modified',)
         model = Review
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     """
     Serializer for CommentViewSet.
     """
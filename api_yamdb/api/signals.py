@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+
+from .authentication import cache_user_state, user_state
+from .caching import CATALOG_SCOPE, invalidate_on_commit
+
+
+@receiver([post_save, post_delete], sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    invalidate_on_commit('titles', f'title:{instance.pk}')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, pk_set, reverse, **kwargs):
+    if not kwargs['action'].startswith('post_'):
+        return
+    if not reverse:
+        invalidate_on_commit('titles', f'title:{instance.pk}')
+    elif pk_set is None:
+        invalidate_on_commit(CATALOG_SCOPE)
+    else:
+        invalidate_on_commit('titles', *(f'title:{pk}' for pk in pk_set))
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_review_title(sender, instance, **kwargs):
+    # stored rating of the title has changed
+    invalidate_on_commit('titles', f'title:{instance.title_id}')
+
+
+@receiver([post_save, post_delete], sender=Genre)
+def invalidate_genre(sender, instance, **kwargs):
+    invalidate_on_commit('genres', 'titles', 'taxonomy')
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    invalidate_on_commit('categories', 'titles', 'taxonomy')
+
+
+@receiver(post_save, sender=User)
+def refresh_user_state(sender, instance, **kwargs):
+    state = user_state(instance)
+    transaction.on_commit(lambda: cache_user_state(instance.pk, state))
+
+
+@receiver(post_delete, sender=User)
+def revoke_user_state(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: cache_user_state(pk, None))
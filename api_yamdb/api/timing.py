@@ -0,0 +1,74 @@
+import contextlib
+import time
+from contextvars import ContextVar
+
+# metric name -> seconds, only set while a sampled request is handled,
+# 'queries' counts the SQL queries
+current_timings = ContextVar('current_timings', default=None)
+measure_depth = ContextVar('measure_depth', default=0)
+
+
+@contextlib.contextmanager
+def measure(name):
+    """
+    Adds the time spent in the block to the metric of the current
+    sampled request. Nested blocks are not counted twice,
+    outside of a sampled request it does nothing
+    """
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    depth = measure_depth.get()
+    measure_depth.set(depth + 1)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        measure_depth.set(depth)
+        if not depth:
+            timings[name] = (
+                timings.get(name, 0) + time.perf_counter() - started
+            )
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper of every connection: adds the query to the current
+    sampled request, in whatever thread the request runs it
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings['db'] += time.perf_counter() - started
+        timings['queries'] += 1
+
+
+def install_query_recorder(connection, **kwargs):
+    """
+    Also a connection_created receiver: connections of pool threads
+    and of the sync thread of ASGI record queries too
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedSerializerMixin:
+    """
+    Reports validation and to_representation time of a serializer
+    as the 'serializer' Server-Timing metric
+    """
+
+    def to_representation(self, instance):
+        if current_timings.get() is None:
+            return super().to_representation(instance)
+        with measure('serializer'):
+            return super().to_representation(instance)
+
+    def is_valid(self, raise_exception=False):
+        with measure('serializer'):
+            return super().is_valid(raise_exception=raise_exception)
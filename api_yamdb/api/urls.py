@@ -1,4 +1,4 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework import routers
 
 from . import views
@@ -24,5 +24,10 @@ v1_router.register('users', views.UserViewSet, basename='users')
 urlpatterns = [
     path('v1/auth/signup/', views.send_confirmation_code, name='signup'),
     path('v1/auth/token/', views.get_token, name='token'),
+    re_path(
+        r'^v1/export/(?P<resource>titles|reviews)'
+        r'\.(?P<file_format>jsonl|csv)$',
+        views.export_catalog, name='export'
+    ),
     path('v1/', include(v1_router.urls)),
 ]
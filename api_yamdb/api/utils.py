@@ -1,10 +1,29 @@
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
 def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
+    # lets api.authentication.ClaimsJWTAuthentication skip the users table
+    refresh['username'] = user.username
+    refresh['role'] = user.role
+    refresh['is_staff'] = user.is_staff
 
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
     }
+
+
+class ConfirmationCodeGenerator(PasswordResetTokenGenerator):
+    """
+    Password reset tokens that a new signup of the user invalidates
+    """
+
+    def _make_hash_value(self, user, timestamp):
+        return (
+            super()._make_hash_value(user, timestamp) + user.signup_nonce
+        )
+
+
+confirmation_code_generator = ConfirmationCodeGenerator()
@@ -1,7 +1,6 @@
 import re
 
 from rest_framework.exceptions import ValidationError
-from users.models import User
 
 username_pattern = re.compile(r'^[\w.@+-]+\Z')
 
@@ -15,22 +14,26 @@ def validate_username(value):
         )
 
 
-def validate_email_exists(email):
-    if User.objects.filter(email=email).exists():
-        raise ValidationError(
-            'Пользователь с такой почтой '
-            'уже зарегестрирован'
-        )
-
-
-def validate_username_exists(username):
-    if User.objects.filter(username=username).exists():
-        raise ValidationError(
-            'Пользователь c таким именем '
-            'уже зарегестрирован'
-        )
-
-
-def validate_username_or_email_exists(username, email):
-    validate_username_exists(username)
-    validate_email_exists(email)
+def validate_signup_users(users, username, email):
+    """
+    users: the ones User.objects.signup returned.
+    Signing up again with the same username and email is allowed,
+    a username or an email of someone else is not
+    """
+    if len(users) == 1:
+        user = users[0]
+        same_username = user.username.casefold() == username.casefold()
+        same_email = user.email.casefold() == email.casefold()
+        if same_username and same_email:
+            return user
+    errors = {}
+    for user in users:
+        if user.username.casefold() == username.casefold():
+            errors['username'] = (
+                'Пользователь c таким именем уже зарегестрирован'
+            )
+        if user.email.casefold() == email.casefold():
+            errors['email'] = (
+                'Пользователь с такой почтой уже зарегестрирован'
+            )
+    raise ValidationError(errors)
@@ -1,46 +1,116 @@
+from api.authentication import load_user
 from api.permissions import IsAdminOrModeratorOrAuthorOrReadOnly
 from django.conf import settings
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from django.http import Http404, StreamingHttpResponse
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from reviews.models import Category, Genre, Review, Title
+from reviews.leaderboard import top_titles
+from reviews.models import (SCORE_FIELDS, Category, Comment, Genre, Review,
+                            Title)
 from users.models import User
 
+from .caching import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .export import CONTENT_TYPES, export, outside_event_loop
+from .fieldsets import SparseFieldsetMixin
 from .filters import TitleFilter
-from .permissions import IsAdminOrReadOnly
+from .mail import enqueue_mail
+from .pagination import OptionalCursorPagination
+from .permissions import IsAdmin, IsAdminOrReadOnly
+from .rows import (CommentRowSerializer, ReviewRowSerializer, RowListMixin,
+                   TitleRowSerializer)
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, GetTokenSerializer,
-                          ReviewSerializer, SignUpSerializer, TitleSerializer,
-                          TitleSerializerWithSlugFields, UserSerializer)
-from .utils import get_tokens_for_user
-from .validators import validate_username_or_email_exists
+                          LeaderboardQuerySerializer, ReviewSerializer,
+                          SignUpSerializer, TitleBatchItemSerializer,
+                          TitleDetailSerializer, TitleRankSerializer,
+                          TitleSerializer, TitleSerializerWithSlugFields,
+                          UserSerializer)
+from .utils import confirmation_code_generator, get_tokens_for_user
+from .validators import validate_signup_users
 from .viewsets import CreateListDelVS
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(CachedResponseMixin, ConditionalGetMixin,
+                   SparseFieldsetMixin, RowListMixin, viewsets.ModelViewSet):
     """
     Supports all request methods
     uses a different serializer for list and retrieve
     can filter by category and genre slugs + year and name
+    anonymous reads are served from the response cache,
+    detail adds the score distribution and supports conditional GET,
+    ?fields= narrows the response,
+    list is serialized from values() rows
     """
     serializer_class = TitleSerializer
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+    row_serializer_class = TitleRowSerializer
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = (IsAdminOrReadOnly, )
     filter_backends = (DjangoFilterBackend, )
     filterset_class = TitleFilter
+    sparse_paths = {
+        'category': ('category__name', 'category__slug'),
+        'genre': ('genre',),
+        'score_distribution': SCORE_FIELDS,
+    }
 
     def get_serializer_class(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action == 'retrieve':
+            return TitleDetailSerializer
+        if self.action == 'list':
             return TitleSerializer
         return TitleSerializerWithSlugFields
 
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Creates a list of titles at once, see TitleBatchSerializer
+        """
+        serializer = TitleBatchItemSerializer(
+            data=request.data, many=True,
+            context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        ids = [title.id for title in serializer.save()]
+        titles = self.get_queryset().in_bulk(ids)
+        return Response(
+            TitleSerializer([titles[pk] for pk in ids], many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False)
+    def top(self, request):
+        """
+        Best titles by Bayesian score, of ?category= and ?genre=,
+        read from the materialized leaderboard (reviews.leaderboard)
+        """
+        query = LeaderboardQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response(
+            TitleRankSerializer(top_titles(**query.validated_data),
+                                many=True).data
+        )
+
+    def get_last_modified(self, **kwargs):
+        # not an id: the lookup answers 404
+        if not kwargs.get('pk', '').isdigit():
+            return None
+        return Title.objects.filter(
+            pk=kwargs['pk']
+        ).values_list('modified', flat=True).first()
 
-class GenreViewSet(CreateListDelVS):
+    def get_cache_scopes(self, **kwargs):
+        if 'pk' in kwargs:
+            return [f'title:{kwargs["pk"]}', 'taxonomy']
+        return ['titles']
+
+
+class GenreViewSet(CachedResponseMixin, CreateListDelVS):
 
     serializer_class = GenreSerializer
     queryset = Genre.objects.all()
@@ -48,8 +118,11 @@ class GenreViewSet(CreateListDelVS):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
 
+    def get_cache_scopes(self, **kwargs):
+        return ['genres']
+
 
-class CategoryViewSet(CreateListDelVS):
+class CategoryViewSet(CachedResponseMixin, CreateListDelVS):
 
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
@@ -57,79 +130,126 @@ class CategoryViewSet(CreateListDelVS):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
 
+    def get_cache_scopes(self, **kwargs):
+        return ['categories']
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsetMixin, RowListMixin,
+                    viewsets.ModelViewSet):
     """
     Supports all request methods except PUT.
     Access rights: administrator, moderator, author or read-only.
+    Paginated by page number, or by (pub_date, id) keyset with ?cursor=
+    Supports conditional GET and ?fields=, list is serialized
+    from values() rows.
     """
     serializer_class = ReviewSerializer
+    row_serializer_class = ReviewRowSerializer
     permission_classes = (IsAdminOrModeratorOrAuthorOrReadOnly,)
+    pagination_class = OptionalCursorPagination
+    sparse_paths = {'author': ('author__username',)}
+    # keyset cursors are built from them
+    sparse_always = ('pub_date',)
 
-    def get_title(self):
-        return get_object_or_404(
-            Title, pk=self.kwargs.get('title_id')
-        )
+    @cached_property
+    def title_modified(self):
+        """
+        Modified timestamp of the title, None if there is no such title.
+        The only query for the parent, it is also the conditional GET check
+        """
+        return Title.objects.filter(
+            pk=self.kwargs['title_id']
+        ).values_list('modified', flat=True).first()
+
+    def check_title(self):
+        if self.title_modified is None:
+            raise Http404
+
+    def get_last_modified(self, **kwargs):
+        return self.title_modified
 
     def perform_create(self, serializer):
-        title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        self.check_title()
+        serializer.save(
+            author_id=self.request.user.id, title_id=self.kwargs['title_id']
+        )
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        self.check_title()
+        return Review.objects.filter(
+            title_id=self.kwargs['title_id']
+        ).select_related('author')
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, SparseFieldsetMixin, RowListMixin,
+                     viewsets.ModelViewSet):
     """
     Supports all request methods except PUT.
     Access rights: administrator, moderator, author or read-only.
+    Paginated by page number, or by (pub_date, id) keyset with ?cursor=
+    Supports conditional GET and ?fields=, list is serialized
+    from values() rows.
     """
     serializer_class = CommentSerializer
+    row_serializer_class = CommentRowSerializer
     permission_classes = (IsAdminOrModeratorOrAuthorOrReadOnly,)
+    pagination_class = OptionalCursorPagination
+    sparse_paths = {'author': ('author__username',)}
+    # keyset cursors are built from them
+    sparse_always = ('pub_date',)
 
-    def get_review(self):
-        return get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title=self.kwargs.get('title_id')
-        )
+    @cached_property
+    def review_modified(self):
+        """
+        Modified timestamp of the review of the title,
+        None if there is no such review
+        """
+        return Review.objects.filter(
+            pk=self.kwargs['review_id'], title_id=self.kwargs['title_id']
+        ).values_list('modified', flat=True).first()
+
+    def check_review(self):
+        if self.review_modified is None:
+            raise Http404
+
+    def get_last_modified(self, **kwargs):
+        return self.review_modified
 
     def perform_create(self, serializer):
-        review = self.get_review()
-        serializer.save(author=self.request.user, review=review)
+        self.check_review()
+        serializer.save(
+            author_id=self.request.user.id,
+            review_id=self.kwargs['review_id']
+        )
 
     def get_queryset(self):
-        return self.get_review().сomments.all()
+        self.check_review()
+        return Comment.objects.filter(
+            review_id=self.kwargs['review_id']
+        ).select_related('author')
 
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def send_confirmation_code(request):
     """
-    If both passed fields are unique creates a new user
-    otherwise fetches an existing one
-    sends code
+    Creates a user unless the username or email is taken,
+    an existing user with both gets a new code, the earlier ones stop working
+    queues the code for deliver_mail
     """
     serializer = SignUpSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     email, username = serializer.validated_data.values()
-    if not User.objects.filter(email=email, username=username).exists():
-        validate_username_or_email_exists(
-            username=username,
-            email=email
-        )
-        user = User.objects.create(
-            username=username, email=email
-        )
-    user = User.objects.get(username=username)
-    confirmation_code = default_token_generator.make_token(user)
-    user.confirmation_code = confirmation_code
-    user.save()
-    send_mail(
+    user = validate_signup_users(
+        User.objects.signup(username, email), username, email
+    )
+    if not user.created:
+        User.objects.renew_signup_nonce(user)
+    enqueue_mail(
         'Код подтверждения Yamdb',
-        f'Ваш код подтверждения: {confirmation_code}',
-        settings.DEFAULT_FROM_EMAIL,
-        [email]
+        'Ваш код подтверждения: '
+        f'{confirmation_code_generator.make_token(user)}',
+        user.email
     )
     return Response(
         serializer.validated_data,
@@ -145,18 +265,29 @@ def get_token(request):
     """
     serializer = GetTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    user = get_object_or_404(
-        User, username=serializer.validated_data['username']
-    )
-    confirmation_code = serializer.validated_data['confirmation_code']
-    if default_token_generator.check_token(user, confirmation_code):
-        token = get_tokens_for_user(user)
-        response = {'token': str(token['access'])}
-        return Response(response, status=status.HTTP_200_OK)
+    token = get_tokens_for_user(serializer.validated_data['user'])
     return Response(
-        serializer.errors,
-        status=status.HTTP_400_BAD_REQUEST
+        {'token': str(token['access'])},
+        status=status.HTTP_200_OK
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def export_catalog(request, resource, file_format):
+    """
+    Streams all titles or reviews as JSON lines or CSV, admin only
+    """
+    response = StreamingHttpResponse(
+        outside_event_loop(
+            export(resource, file_format, settings.EXPORT_CHUNK_SIZE)
+        ),
+        content_type=CONTENT_TYPES[file_format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{resource}.{file_format}"'
     )
+    return response
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -186,9 +317,9 @@ class UserViewSet(viewsets.ModelViewSet):
         This action method allows users to access their own profiles
         and patch them at api/v1/users/me
         """
-        user = request.user
+        user = load_user(request.user)
         if request.method == "GET":
-            serializer = self.get_serializer(request.user)
+            serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
         if request.method == "PATCH":
             if 'role' in request.data and not (user.is_admin or user.is_staff):
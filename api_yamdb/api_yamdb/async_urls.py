@@ -0,0 +1,9 @@
+from api.async_views import async_read_urls
+from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+
+from . import urls
+
+# ROOT_URLCONF of ASGI deployments (ASYNC_READ_VIEWS)
+urlpatterns = async_read_urls(
+    urls.urlpatterns, (TitleViewSet, ReviewViewSet, CommentViewSet)
+)
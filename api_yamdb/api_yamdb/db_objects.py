@@ -0,0 +1,61 @@
+"""
+Database objects created by raw SQL in migrations, unknown to Django.
+SQLite drops them when a migration rebuilds their table (adding,
+altering or removing a column), such migrations create them again
+with these statements. tests/test_db_objects.py checks they exist
+"""
+
+# keep reviews_title_fts in sync with reviews_title on SQLite
+# (0005_title_search)
+TITLE_SEARCH_TRIGGERS = {
+    'reviews_title_fts_insert': """
+    CREATE TRIGGER IF NOT EXISTS reviews_title_fts_insert
+    AFTER INSERT ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    'reviews_title_fts_delete': """
+    CREATE TRIGGER IF NOT EXISTS reviews_title_fts_delete
+    AFTER DELETE ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts
+        (reviews_title_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    'reviews_title_fts_update': """
+    CREATE TRIGGER IF NOT EXISTS reviews_title_fts_update
+    AFTER UPDATE OF name, description ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts
+        (reviews_title_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+}
+
+# usernames and emails unique ignoring case, on every database
+# (users 0002_case_insensitive_lookups)
+USER_LOWER_INDEXES = {
+    'users_user_username_lower_uniq':
+        'CREATE UNIQUE INDEX IF NOT EXISTS users_user_username_lower_uniq '
+        'ON users_user (LOWER(username))',
+    'users_user_email_lower_uniq':
+        'CREATE UNIQUE INDEX IF NOT EXISTS users_user_email_lower_uniq '
+        'ON users_user (LOWER(email))',
+}
+
+
+def create_title_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in TITLE_SEARCH_TRIGGERS.values():
+            schema_editor.execute(sql)
+
+
+def create_user_lower_indexes(apps, schema_editor):
+    for sql in USER_LOWER_INDEXES.values():
+        schema_editor.execute(sql)
@@ -34,15 +34,24 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ServerTimingMiddleware',
 ]
 
-ROOT_URLCONF = 'api_yamdb.urls'
+# set by asgi.py: titles, reviews and comments are read in a thread pool
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', default='False') == 'True'
+
+ASYNC_READ_THREADS = int(os.getenv('ASYNC_READ_THREADS', default=16))
+
+ROOT_URLCONF = (
+    'api_yamdb.async_urls' if ASYNC_READ_VIEWS else 'api_yamdb.urls'
+)
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
@@ -77,6 +86,23 @@ DATABASES = {
     }
 }
 
+# read replicas of the default database: hosts, database files on SQLite,
+# e.g. DB_REPLICAS=replica1,replica2; reads of GET requests go to them
+DATABASE_REPLICAS = []
+DB_REPLICA_SETTING = 'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'
+for number, replica in enumerate(filter(None, os.getenv('DB_REPLICAS', default='').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        DB_REPLICA_SETTING: replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter'] if DATABASE_REPLICAS else []
+
+# seconds a user reads the primary after a write, more than replication lag
+DB_READ_PRIMARY_AFTER_WRITE = int(os.getenv('DB_READ_PRIMARY_AFTER_WRITE', default=10))
+
 
 # Password validation
 
@@ -129,14 +155,85 @@ DEFAULT_FROM_EMAIL = 'yamdb <admin@yamdb.ru>'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# most titles accepted by POST /api/v1/titles/batch/
+TITLE_BATCH_MAX_SIZE = int(os.getenv('TITLE_BATCH_MAX_SIZE', default=1000))
+
+# title, review and comment lists are serialized from values() rows
+# by api.rows, ROW_LIST_SERIALIZERS=False uses the model serializers
+ROW_LIST_SERIALIZERS = os.getenv('ROW_LIST_SERIALIZERS', default='True') == 'True'
+
+# rows fetched at a time by /api/v1/export/ and `manage.py export_catalog`
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', default=2000))
+
+# /api/v1/titles/top/: the mean of all reviews counts for this many
+# reviews of every title, see reviews.models.RankingPrior
+LEADERBOARD_PRIOR_WEIGHT = int(os.getenv('LEADERBOARD_PRIOR_WEIGHT', default=10))
+
+LEADERBOARD_MAX_SIZE = int(os.getenv('LEADERBOARD_MAX_SIZE', default=100))
+
+# outbound mail queue, drained by `manage.py deliver_mail`
+MAIL_QUEUE = {
+    'BATCH_SIZE': int(os.getenv('MAIL_QUEUE_BATCH_SIZE', default=100)),
+    'WORKERS': int(os.getenv('MAIL_QUEUE_WORKERS', default=4)),
+    'MAX_ATTEMPTS': int(os.getenv('MAIL_QUEUE_MAX_ATTEMPTS', default=5)),
+    # seconds before the first retry, doubled after every failure
+    'RETRY_DELAY': int(os.getenv('MAIL_QUEUE_RETRY_DELAY', default=60)),
+    # seconds a claimed message stays hidden from other workers
+    'LEASE': int(os.getenv('MAIL_QUEUE_LEASE', default=300)),
+}
+
+# api.authentication.ClaimsJWTAuthentication builds request.user from
+# token claims, JWT_STATELESS_AUTH=False loads users.User on every request
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', default='True') == 'True'
+
+JWT_USER_STATE_CACHE_TIMEOUT = int(os.getenv('JWT_USER_STATE_CACHE_TIMEOUT', default=60))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication'
+        if JWT_STATELESS_AUTH
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+
+# anonymous catalog reads, locmem is per process: use a shared backend
+# (file, memcached, redis) with several workers
+API_RESPONSE_CACHE = {
+    'ENABLED': os.getenv('API_RESPONSE_CACHE_ENABLED', default='True') == 'True',
+    'TIMEOUT': int(os.getenv('API_RESPONSE_CACHE_TIMEOUT', default=60)),
+}
+
+SERVER_TIMING = {
+    'ENABLED': os.getenv('SERVER_TIMING_ENABLED', default='False') == 'True',
+    'SAMPLE_RATE': float(os.getenv('SERVER_TIMING_SAMPLE_RATE', default=0.01)),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.server_timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=100),
     'AUTH_HEADER_TYPES': ('Bearer',),
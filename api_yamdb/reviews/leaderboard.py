@@ -0,0 +1,129 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, F, FloatField, Subquery
+from django.db.models.functions import Cast
+
+from .models import Category, Genre, RankingPrior, Review, Title, TitleRank
+
+# prior mean until there are reviews, the middle of the 1-10 scale
+DEFAULT_MEAN = 5.5
+
+
+def bayesian_score(review_sum, review_count):
+    """
+    Score expression for UPDATE statements, reads the prior in subqueries
+    """
+    prior = RankingPrior.objects.filter(pk=RankingPrior.PK)
+    return (
+        Cast(review_sum, FloatField()) + Subquery(
+            prior.annotate(total=F('weight') * F('mean')).values('total')
+        )
+    ) / (review_count + Subquery(prior.values('weight')))
+
+
+def shift_title_rank(title_id, score_delta, count_delta):
+    """
+    Moves review counters and score of the title's rows
+    like shift_title_score moves the title's ones
+    """
+    TitleRank.objects.filter(title_id=title_id).update(
+        review_sum=F('review_sum') + score_delta,
+        review_count=F('review_count') + count_delta,
+        score=bayesian_score(
+            F('review_sum') + score_delta, F('review_count') + count_delta
+        )
+    )
+
+
+def get_prior():
+    prior, _ = RankingPrior.objects.get_or_create(
+        pk=RankingPrior.PK, defaults={
+            'mean': DEFAULT_MEAN,
+            'weight': settings.LEADERBOARD_PRIOR_WEIGHT,
+        }
+    )
+    return prior
+
+
+def title_ranks(titles, prior):
+    """
+    TitleRank rows of (id, category_id, review_sum, review_count) titles
+    """
+    genres = defaultdict(list)
+    for title_id, genre_id in Title.genre.through.objects.filter(
+        title_id__in=[title[0] for title in titles]
+    ).values_list('title_id', 'genre_id'):
+        genres[title_id].append(genre_id)
+    return [
+        TitleRank(title_id=title_id, genre_id=genre_id,
+                  category_id=category_id, review_sum=review_sum,
+                  review_count=review_count,
+                  score=prior.score(review_sum, review_count))
+        for title_id, category_id, review_sum, review_count in titles
+        for genre_id in (None, *genres[title_id])
+    ]
+
+
+def sync_title_ranks(title_ids):
+    """
+    Rewrites the rows of the titles, after their category or genres
+    change or they are created. The titles stay locked until commit,
+    so their reviews cannot shift the rows that are being replaced
+    """
+    title_ids = list(title_ids)
+    prior = get_prior()
+    with transaction.atomic():
+        titles = list(Title.objects.select_for_update().filter(
+            pk__in=title_ids
+        ).values_list('id', 'category_id', 'review_sum', 'review_count'))
+        TitleRank.objects.filter(title_id__in=title_ids).delete()
+        TitleRank.objects.bulk_create(title_ranks(titles, prior))
+
+
+def rebuild_leaderboard(chunk_size=2000):
+    """
+    Recomputes the prior from all reviews and rewrites every row,
+    e.g. after bulk imports, returns the number of ranked titles
+    """
+    mean = Review.objects.aggregate(mean=Avg('score'))['mean']
+    ranked = 0
+    with transaction.atomic():
+        prior, _ = RankingPrior.objects.update_or_create(
+            pk=RankingPrior.PK, defaults={
+                'mean': DEFAULT_MEAN if mean is None else mean,
+                'weight': settings.LEADERBOARD_PRIOR_WEIGHT,
+            }
+        )
+        TitleRank.objects.all().delete()
+        titles = Title.objects.order_by('id').values_list(
+            'id', 'category_id', 'review_sum', 'review_count'
+        ).iterator(chunk_size=chunk_size)
+        chunk = list(islice(titles, chunk_size))
+        while chunk:
+            TitleRank.objects.bulk_create(title_ranks(chunk, prior))
+            ranked += len(chunk)
+            chunk = list(islice(titles, chunk_size))
+    return ranked
+
+
+def top_titles(category=None, genre=None, limit=10):
+    """
+    Best scored titles, of a category and a genre given by slugs:
+    one query, the slugs are resolved by subqueries so the rows
+    are read in index order
+    """
+    ranks = TitleRank.objects.select_related('title', 'category')
+    if genre is None:
+        ranks = ranks.filter(genre__isnull=True)
+    else:
+        ranks = ranks.filter(genre_id=Subquery(
+            Genre.objects.filter(slug=genre).values('id')
+        ))
+    if category is not None:
+        ranks = ranks.filter(category_id=Subquery(
+            Category.objects.filter(slug=category).values('id')
+        ))
+    return ranks.order_by('-score', 'title_id')[:limit]
@@ -0,0 +1,83 @@
+from django.db import migrations
+
+# PostgreSQL: generated column, recomputed by the database on every write
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE reviews_title ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(name, '')), 'A')
+        || setweight(
+            to_tsvector('russian', coalesce(description, '')), 'B'
+        )
+    ) STORED
+    """,
+    'CREATE INDEX reviews_title_search_idx '
+    'ON reviews_title USING gin (search_vector)',
+]
+POSTGRESQL_BACKWARD = [
+    'ALTER TABLE reviews_title DROP COLUMN search_vector',
+]
+
+# SQLite: external content FTS5 table, triggers keep it in sync
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description, content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts
+        (reviews_title_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_update AFTER UPDATE OF name, description
+    ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts
+        (reviews_title_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO reviews_title_fts (reviews_title_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    'DROP TRIGGER reviews_title_fts_insert',
+    'DROP TRIGGER reviews_title_fts_delete',
+    'DROP TRIGGER reviews_title_fts_update',
+    'DROP TABLE reviews_title_fts',
+]
+
+FORWARD = {'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD}
+BACKWARD = {'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD}
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_modified_timestamps'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(FORWARD), run(BACKWARD)),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 3.2.18 on 2026-10-18 03:23
+
+from collections import defaultdict
+from itertools import islice
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Avg
+
+
+def fill_leaderboard(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    RankingPrior = apps.get_model('reviews', 'RankingPrior')
+    TitleRank = apps.get_model('reviews', 'TitleRank')
+    mean = Review.objects.aggregate(mean=Avg('score'))['mean']
+    mean = 5.5 if mean is None else mean
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    RankingPrior.objects.create(pk=1, mean=mean, weight=weight)
+    titles = Title.objects.order_by('id').values_list(
+        'id', 'category_id', 'review_sum', 'review_count'
+    ).iterator(chunk_size=2000)
+    chunk = list(islice(titles, 2000))
+    while chunk:
+        genres = defaultdict(list)
+        for title_id, genre_id in Title.genre.through.objects.filter(
+            title_id__in=[title[0] for title in chunk]
+        ).values_list('title_id', 'genre_id'):
+            genres[title_id].append(genre_id)
+        TitleRank.objects.bulk_create(
+            TitleRank(title_id=title_id, genre_id=genre_id,
+                      category_id=category_id, review_sum=review_sum,
+                      review_count=review_count,
+                      score=(review_sum + weight * mean)
+                      / (review_count + weight))
+            for title_id, category_id, review_sum, review_count in chunk
+            for genre_id in (None, *genres[title_id])
+        )
+        chunk = list(islice(titles, 2000))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingPrior',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mean', models.FloatField(verbose_name='Mean score of all reviews')),
+                ('weight', models.PositiveIntegerField(verbose_name='Reviews the mean counts for')),
+            ],
+            options={
+                'verbose_name': 'Ranking prior',
+                'verbose_name_plural': 'Ranking priors',
+            },
+        ),
+        migrations.CreateModel(
+            name='TitleRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_sum', models.PositiveIntegerField(default=0, verbose_name='Sum of review scores')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Number of reviews')),
+                ('score', models.FloatField(verbose_name='Bayesian score')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reviews.category', verbose_name='Category of the title')),
+                ('genre', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.genre', verbose_name='Genre board, null for all genres')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranks', to='reviews.title', verbose_name='Ranked title')),
+            ],
+            options={
+                'verbose_name': 'Title rank',
+                'verbose_name_plural': 'Title ranks',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titlerank',
+            index=models.Index(fields=['genre', '-score', 'title'], name='title_rank_genre_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titlerank',
+            index=models.Index(fields=['genre', 'category', '-score', 'title'], name='title_rank_category_score_idx'),
+        ),
+        migrations.RunPython(fill_leaderboard, migrations.RunPython.noop),
+    ]
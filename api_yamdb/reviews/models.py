@@ -1,9 +1,13 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from users.models import User
 
 from .validators import year_regex, year_validator
 
+# Review.score values, Title keeps a counter column for each
+SCORES = range(1, 11)
+SCORE_FIELDS = tuple(f'score_{score}' for score in SCORES)
+
 
 class Genre(models.Model):
     name = models.CharField(max_length=256, verbose_name='Genre name')
@@ -52,15 +56,54 @@ class Title(models.Model):
         verbose_name='Release year'
     )
     description = models.CharField(max_length=1000, verbose_name='Description')
+    rating = models.FloatField(
+        null=True, blank=True,
+        verbose_name='Rating'
+    )
+    review_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Sum of review scores'
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Number of reviews'
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Title, genres or reviews modified'
+    )
+    # score distribution, see SCORE_FIELDS
+    score_1 = models.PositiveIntegerField(default=0, verbose_name='Scored 1')
+    score_2 = models.PositiveIntegerField(default=0, verbose_name='Scored 2')
+    score_3 = models.PositiveIntegerField(default=0, verbose_name='Scored 3')
+    score_4 = models.PositiveIntegerField(default=0, verbose_name='Scored 4')
+    score_5 = models.PositiveIntegerField(default=0, verbose_name='Scored 5')
+    score_6 = models.PositiveIntegerField(default=0, verbose_name='Scored 6')
+    score_7 = models.PositiveIntegerField(default=0, verbose_name='Scored 7')
+    score_8 = models.PositiveIntegerField(default=0, verbose_name='Scored 8')
+    score_9 = models.PositiveIntegerField(default=0, verbose_name='Scored 9')
+    score_10 = models.PositiveIntegerField(default=0, verbose_name='Scored 10')
 
     class Meta:
         ordering = ['name']
         verbose_name = 'Title'
         verbose_name_plural = 'Titles'
+        indexes = [
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(fields=['year', 'name'], name='title_year_name_idx'),
+        ]
 
     def __str__(self) -> str:
         return f'{self.category.name} {self.name}'
 
+    @property
+    def score_distribution(self):
+        """
+        Number of reviews per score, every score included
+        """
+        return {str(score): getattr(self, field)
+                for score, field in zip(SCORES, SCORE_FIELDS)}
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -77,17 +120,30 @@ class Review(models.Model):
     )
     text = models.TextField(verbose_name='Text')
     score = models.IntegerField(
-        validators=[MinValueValidator(1), MaxValueValidator(10)],
+        validators=[MinValueValidator(SCORES[0]),
+                    MaxValueValidator(SCORES[-1])],
         verbose_name='Score'
     )
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Review date')
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Review or comments modified'
+    )
 
     class Meta:
         ordering = ['pub_date']
         verbose_name = 'Review'
         verbose_name_plural = 'Reviews'
+        indexes = [
+            # list and keyset pages of a title, (pub_date, id) order
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
+        # the unique constraint also indexes the one review check
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
@@ -98,6 +154,27 @@ class Review(models.Model):
     def __str__(self):
         return f'{self.title}, {self.author}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_score()
+        return instance
+
+    def remember_score(self):
+        """
+        Stores score and title as they are in the database,
+        so that the rating signals can work out the difference on update
+        """
+        self._stored_score = self.__dict__.get('score')
+        self._stored_title_id = self.__dict__.get('title_id')
+
+    def save(self, *args, **kwargs):
+        # title counters are updated by a post_save signal,
+        # keep them in the same transaction as the review itself
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        self.remember_score()
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -121,6 +198,97 @@ class Comment(models.Model):
         verbose_name = 'Comment'
         verbose_name_plural = 'Comments'
         ordering = ['pub_date']
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text
+
+
+class RankingPrior(models.Model):
+    """
+    Prior of the Bayesian title score, a single row: a title scores
+    (review_sum + weight * mean) / (review_count + weight),
+    so a few reviews barely move it away from the mean of all reviews
+    """
+    PK = 1
+
+    mean = models.FloatField(verbose_name='Mean score of all reviews')
+    weight = models.PositiveIntegerField(
+        verbose_name='Reviews the mean counts for'
+    )
+
+    class Meta:
+        verbose_name = 'Ranking prior'
+        verbose_name_plural = 'Ranking priors'
+
+    def __str__(self):
+        return f'{self.mean} x {self.weight}'
+
+    def score(self, review_sum, review_count):
+        return (
+            (review_sum + self.weight * self.mean)
+            / (review_count + self.weight)
+        )
+
+
+class TitleRank(models.Model):
+    """
+    Materialized leaderboard, see reviews.leaderboard: a row for every
+    title with genre null and a row for every genre of the title,
+    review counters follow the title's ones
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='ranks',
+        verbose_name='Ranked title'
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+',
+        # leads both indexes of Meta
+        db_index=False,
+        verbose_name='Genre board, null for all genres'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='Category of the title'
+    )
+    review_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Sum of review scores'
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Number of reviews'
+    )
+    score = models.FloatField(verbose_name='Bayesian score')
+
+    class Meta:
+        verbose_name = 'Title rank'
+        verbose_name_plural = 'Title ranks'
+        indexes = [
+            # a board, all titles or a genre, best first
+            models.Index(
+                fields=['genre', '-score', 'title'],
+                name='title_rank_genre_score_idx'
+            ),
+            # a board narrowed to a category
+            models.Index(
+                fields=['genre', 'category', '-score', 'title'],
+                name='title_rank_category_score_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score}'
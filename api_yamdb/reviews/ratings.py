@@ -0,0 +1,67 @@
+from django.db.models import Avg, Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from .leaderboard import shift_title_rank
+from .models import SCORE_FIELDS, SCORES, Review, Title
+
+
+def shift_title_score(title_id, added=None, removed=None):
+    """
+    Adds a review score to the title and/or removes one:
+    review sum, count, the score's distribution counter, rating and
+    the modified timestamp change in the same UPDATE statement,
+    the row lock makes concurrent reviews safe.
+    The title's leaderboard rows are moved along
+    """
+    score_delta = (added or 0) - (removed or 0)
+    count_delta = (added is not None) - (removed is not None)
+    counters = {}
+    # scores outside SCORES bypassed the validators, they have no counter
+    if removed in SCORES:
+        counters[f'score_{removed}'] = F(f'score_{removed}') - 1
+    if added in SCORES:
+        field = f'score_{added}'
+        counters[field] = counters.get(field, F(field)) + 1
+    Title.objects.filter(pk=title_id).update(
+        review_sum=F('review_sum') + score_delta,
+        review_count=F('review_count') + count_delta,
+        rating=(
+            Cast(F('review_sum') + score_delta, FloatField())
+            / NullIf(F('review_count') + count_delta, 0)
+        ),
+        modified=timezone.now(),
+        **counters
+    )
+    shift_title_rank(title_id, score_delta, count_delta)
+
+
+def rebuild_ratings(titles=None):
+    """
+    Recalculates rating counters and score distributions of given titles
+    (all by default) from the reviews table, returns number of updated titles
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return titles.update(
+        review_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0
+        ),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')),
+            0
+        ),
+        rating=Subquery(
+            reviews.annotate(average=Avg('score')).values('average')
+        ),
+        **{
+            field: Coalesce(Subquery(reviews.filter(score=score).annotate(
+                total=Count('id')
+            ).values('total')), 0)
+            for score, field in zip(SCORES, SCORE_FIELDS)
+        }
+    )
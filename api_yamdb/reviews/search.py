@@ -0,0 +1,69 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+# text search configuration of the search_vector column
+# (migration 0005_title_search), stems russian words,
+# latin ones with the english stemmer
+SEARCH_CONFIG = 'russian'
+# FTS5 index of reviews_title kept in sync by triggers
+SQLITE_FTS_TABLE = 'reviews_title_fts'
+
+
+def search_words(query):
+    return re.findall(r'\w+', query)
+
+
+def postgresql_search(queryset, words):
+    tsquery = f"plainto_tsquery('{SEARCH_CONFIG}', %s)"
+    text = ' '.join(words)
+    return queryset.filter(RawSQL(
+        f'reviews_title.search_vector @@ {tsquery}', (text,),
+        output_field=BooleanField()
+    )).annotate(search_rank=RawSQL(
+        f'ts_rank(reviews_title.search_vector, {tsquery})', (text,),
+        output_field=FloatField()
+    ))
+
+
+def sqlite_search(queryset, words):
+    # every word quoted: a phrase of one token, so no FTS5 operators
+    match = ' '.join('"{}"'.format(word.replace('"', '""'))
+                     for word in words)
+    return queryset.filter(id__in=RawSQL(
+        f'SELECT rowid FROM {SQLITE_FTS_TABLE} '
+        f'WHERE {SQLITE_FTS_TABLE} MATCH %s', (match,)
+    )).annotate(search_rank=RawSQL(
+        # bm25 is lower for better matches, name weighs more
+        f'SELECT -bm25({SQLITE_FTS_TABLE}, 2.0, 1.0) FROM {SQLITE_FTS_TABLE} '
+        f'WHERE {SQLITE_FTS_TABLE} MATCH %s '
+        f'AND {SQLITE_FTS_TABLE}.rowid = reviews_title.id', (match,),
+        output_field=FloatField()
+    ))
+
+
+SEARCH_BACKENDS = {
+    'postgresql': postgresql_search,
+    'sqlite': sqlite_search,
+}
+
+
+def search_titles(queryset, query):
+    """
+    Titles matching every word of the query in name or description,
+    best matches first. Index-backed on PostgreSQL and SQLite,
+    a case-insensitive scan on other databases
+    """
+    words = search_words(query)
+    if not words:
+        return queryset
+    search = SEARCH_BACKENDS.get(connections[queryset.db].vendor)
+    if search is None:
+        for word in words:
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset.order_by('name', 'id')
+    return search(queryset, words).order_by('-search_rank', 'id')
@@ -0,0 +1,104 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .leaderboard import sync_title_ranks
+from .models import Category, Comment, Genre, Review, Title, TitleRank
+from .ratings import rebuild_ratings, shift_title_score
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        shift_title_score(instance.title_id, added=instance.score)
+        return
+    stored_score = getattr(instance, '_stored_score', None)
+    stored_title_id = getattr(instance, '_stored_title_id', None)
+    if stored_score is None or stored_title_id is None:
+        # instance was not loaded from the database, nothing to diff against
+        rebuild_ratings(Title.objects.filter(pk=instance.title_id))
+        sync_title_ranks([instance.title_id])
+        touch_title(instance.title_id)
+    elif stored_title_id != instance.title_id:
+        shift_title_score(stored_title_id, removed=stored_score)
+        shift_title_score(instance.title_id, added=instance.score)
+    elif stored_score != instance.score:
+        shift_title_score(
+            instance.title_id, added=instance.score, removed=stored_score
+        )
+    else:
+        touch_title(instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    shift_title_score(instance.title_id, removed=instance.score)
+
+
+# leaderboard rows (reviews.leaderboard) follow category and genres
+
+
+@receiver(post_save, sender=Title)
+def sync_title_rank(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_title_ranks([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def sync_genre_ranks(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        sync_title_ranks([instance.pk])
+    elif pk_set is None:
+        TitleRank.objects.filter(genre=instance).delete()
+    else:
+        sync_title_ranks(pk_set)
+
+
+# modified timestamps back conditional GETs (see api.conditional):
+# Title.modified covers the title detail and its reviews,
+# Review.modified covers the review's comments.
+# Review writes that shift the score touch the title in the same UPDATE
+
+
+def touch_title(title_id):
+    Title.objects.filter(pk=title_id).update(modified=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def touch_comment_review(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Review.objects.filter(pk=instance.review_id).update(
+            modified=timezone.now()
+        )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_genre_titles(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        titles = Title.objects.filter(pk=instance.pk)
+    elif pk_set is not None:
+        titles = Title.objects.filter(pk__in=pk_set)
+    else:
+        titles = Title.objects.filter(genre=instance)
+    titles.update(modified=timezone.now())
+
+
+@receiver([post_save, pre_delete], sender=Genre)
+def touch_titles_of_genre(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.objects.filter(genre=instance).update(modified=timezone.now())
+
+
+@receiver([post_save, pre_delete], sender=Category)
+def touch_titles_of_category(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.objects.filter(category=instance).update(
+            modified=timezone.now()
+        )
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.UserManager()),
+            ],
+        ),
+        # usernames and emails are unique ignoring case,
+        # signup relies on these indexes to reject taken ones
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX users_user_username_lower_uniq '
+            'ON users_user (LOWER(username))',
+            'DROP INDEX users_user_username_lower_uniq',
+        ),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX users_user_email_lower_uniq '
+            'ON users_user (LOWER(email))',
+            'DROP INDEX users_user_email_lower_uniq',
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from api_yamdb.db_objects import create_user_lower_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_case_insensitive_lookups'),
+    ]
+
+    operations = [
+        # confirmation codes come from default_token_generator.
+        # SQLite rebuilds the table without the LOWER() indexes
+        migrations.RunPython(
+            migrations.RunPython.noop, create_user_lower_indexes
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='confirmation_code',
+        ),
+        migrations.RunPython(
+            create_user_lower_indexes, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+import users.models
+from api_yamdb.db_objects import create_user_lower_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_remove_user_confirmation_code'),
+    ]
+
+    operations = [
+        # SQLite rebuilds the table without the LOWER() indexes
+        migrations.RunPython(
+            migrations.RunPython.noop, create_user_lower_indexes
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='signup_nonce',
+            field=models.CharField(
+                default=users.models.new_signup_nonce, editable=False,
+                max_length=32
+            ),
+        ),
+        migrations.RunPython(
+            create_user_lower_indexes, migrations.RunPython.noop
+        ),
+    ]
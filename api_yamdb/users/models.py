@@ -1,5 +1,97 @@
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.auth.models import UserManager as BaseUserManager
+from django.db import connections, models
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
+from django.utils.crypto import get_random_string
+
+# one round trip: the row inserted, or the rows it conflicts with.
+# The main query does not see the CTE's insert, so at most one part returns
+POSTGRESQL_SIGNUP = '''
+WITH inserted AS (
+    INSERT INTO {table} ({columns}) VALUES ({values})
+    ON CONFLICT DO NOTHING
+    RETURNING *
+)
+SELECT * FROM inserted
+UNION ALL
+SELECT * FROM {table}
+WHERE LOWER(username) = LOWER(%s) OR LOWER(email) = LOWER(%s)
+'''
+
+
+def new_signup_nonce():
+    return get_random_string(32)
+
+
+class UserManager(BaseUserManager):
+    """
+    Case-insensitive username and email lookups, served by the LOWER()
+    unique indexes (migration 0002_case_insensitive_lookups)
+    """
+
+    def matching(self, username=None, email=None):
+        """
+        Users with the username or the email, ignoring case
+        """
+        condition = Q()
+        if username is not None:
+            condition |= Q(lower_username=Lower(Value(username)))
+        if email is not None:
+            condition |= Q(lower_email=Lower(Value(email)))
+        return self.alias(
+            lower_username=Lower('username'), lower_email=Lower('email')
+        ).filter(condition)
+
+    def signup(self, username, email):
+        """
+        Inserts a user unless the username or the email is taken,
+        relying on the unique indexes instead of checking first.
+        Returns the new user, or the users the username and email
+        belong to; created is set on each of them
+        """
+        user = self.model(
+            username=username, email=email, password=make_password(None),
+            signup_nonce=new_signup_nonce()
+        )
+        users = self.insert_or_match(user)
+        for found in users:
+            found.created = found.signup_nonce == user.signup_nonce
+        return users
+
+    def renew_signup_nonce(self, user):
+        """
+        Invalidates the confirmation codes issued to the user before
+        """
+        user.signup_nonce = new_signup_nonce()
+        self.filter(pk=user.pk).update(signup_nonce=user.signup_nonce)
+
+    def insert_or_match(self, user):
+        username, email = user.username, user.email
+        connection = connections[self.db]
+        if connection.vendor != 'postgresql':
+            self.bulk_create([user], ignore_conflicts=True)
+            return list(self.matching(username, email)[:2])
+
+        fields = [field for field in self.model._meta.local_concrete_fields
+                  if not field.primary_key]
+        sql = POSTGRESQL_SIGNUP.format(
+            table=connection.ops.quote_name(self.model._meta.db_table),
+            columns=', '.join(
+                connection.ops.quote_name(field.column) for field in fields
+            ),
+            values=', '.join(['%s'] * len(fields))
+        )
+        params = [
+            field.get_db_prep_save(field.pre_save(user, True), connection)
+            for field in fields
+        ] + [username, email]
+        # nothing when a concurrent signup committed after the statement
+        # started, its row is visible to a new one
+        return list(self.raw(sql, params)) or list(
+            self.matching(username, email)[:2]
+        )
 
 
 class User(AbstractUser):
@@ -31,8 +123,14 @@ class User(AbstractUser):
         max_length=254,
         unique=True
     )
+    # part of the confirmation code hash, a new signup renews it
+    signup_nonce = models.CharField(
+        max_length=32,
+        default=new_signup_nonce,
+        editable=False
+    )
 
-    confirmation_code = models.CharField(max_length=10, blank=True, null=True)
+    objects = UserManager()
 
     @property
     def is_admin(self):
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import pytest
+from api.utils import get_tokens_for_user
+from api.views import TitleViewSet
+from django.test import AsyncClient
+from django.urls import resolve
+from reviews.models import Review
+from users.models import User
+
+ASYNC_URLS = 'api_yamdb.async_urls'
+
+
+def get_all(paths):
+    async def requests():
+        client = AsyncClient()
+        return await asyncio.gather(*(client.get(path) for path in paths))
+    return asyncio.run(requests())
+
+
+class TestAsyncUrls:
+
+    def test_read_views_are_async(self):
+        for path in ('/api/v1/titles/', '/api/v1/titles/1/reviews/',
+                     '/api/v1/titles/1/reviews/1/comments/'):
+            view = resolve(path, ASYNC_URLS).func
+            assert asyncio.iscoroutinefunction(view), (
+                f'Проверьте, что {path} обслуживается асинхронным view'
+            )
+        assert not asyncio.iscoroutinefunction(
+            resolve('/api/v1/genres/', ASYNC_URLS).func
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReads:
+
+    def test_same_responses(self, client, settings, title, monkeypatch):
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        paths = ['/api/v1/titles/', f'/api/v1/titles/{title.id}/',
+                 f'/api/v1/titles/{title.id}/reviews/']
+        expected = [client.get(path).json() for path in paths]
+        threads = set()
+        dispatch = TitleViewSet.dispatch
+
+        def spy(self, request, *args, **kwargs):
+            threads.add(threading.current_thread().name)
+            return dispatch(self, request, *args, **kwargs)
+
+        monkeypatch.setattr(TitleViewSet, 'dispatch', spy)
+        settings.ROOT_URLCONF = ASYNC_URLS
+        responses = get_all(paths)
+        assert [response.status_code for response in responses] == [
+            200, 200, 200
+        ]
+        assert [response.json() for response in responses] == expected
+        assert threads and all(
+            name.startswith('async-read') for name in threads
+        ), 'Чтение должно выполняться в пуле потоков'
+
+    def test_writes(self, settings, title):
+        settings.ROOT_URLCONF = ASYNC_URLS
+        user = User.objects.create(username='author', email='a@yamdb.fake')
+        token = get_tokens_for_user(user)['access']
+
+        async def post():
+            return await AsyncClient().post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                {'text': 'text', 'score': 5},
+                content_type='application/json',
+                authorization=f'Bearer {token}'
+            )
+
+        assert asyncio.run(post()).status_code == 201
+        assert Review.objects.filter(title=title, author=user).exists()
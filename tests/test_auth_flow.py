@@ -0,0 +1,131 @@
+import pytest
+from api.models import OutboundEmail
+from api.utils import confirmation_code_generator, get_tokens_for_user
+from django.db import IntegrityError, transaction
+from users.models import User
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+# user upsert (insert, then the conflicting rows on other databases
+# than PostgreSQL) + queued mail
+SIGNUP_QUERY_BUDGET = 3
+# the user
+TOKEN_QUERY_BUDGET = 1
+
+
+def signup(client, username, email):
+    return client.post(SIGNUP_URL, {'username': username, 'email': email})
+
+
+@pytest.mark.django_db
+class TestAuthFlow:
+
+    def test_signup_and_token(self, client, django_assert_max_num_queries):
+        with django_assert_max_num_queries(SIGNUP_QUERY_BUDGET):
+            response = signup(client, 'alice', 'alice@yamdb.fake')
+        assert response.status_code == 200
+        assert response.json() == {
+            'email': 'alice@yamdb.fake', 'username': 'alice'
+        }
+        user = User.objects.get()
+        assert OutboundEmail.objects.get().recipient == user.email
+
+        code = confirmation_code_generator.make_token(user)
+        with django_assert_max_num_queries(TOKEN_QUERY_BUDGET):
+            response = client.post(TOKEN_URL, {
+                'username': 'alice', 'confirmation_code': code
+            })
+        assert response.status_code == 200
+        assert 'token' in response.json()
+
+    def test_signup_again_ignores_case(self, client):
+        signup(client, 'alice', 'alice@yamdb.fake')
+        response = signup(client, 'Alice', 'ALICE@yamdb.fake')
+        assert response.status_code == 200, (
+            'Повторная регистрация должна присылать новый код'
+        )
+        assert User.objects.count() == 1
+        assert OutboundEmail.objects.count() == 2
+
+    def test_signup_again_invalidates_earlier_code(self, client):
+        signup(client, 'alice', 'alice@yamdb.fake')
+        code = confirmation_code_generator.make_token(User.objects.get())
+        signup(client, 'alice', 'alice@yamdb.fake')
+        response = client.post(TOKEN_URL, {
+            'username': 'alice', 'confirmation_code': code
+        })
+        assert response.status_code == 400, (
+            'Код, выданный до повторной регистрации, не должен работать'
+        )
+        code = confirmation_code_generator.make_token(User.objects.get())
+        response = client.post(TOKEN_URL, {
+            'username': 'alice', 'confirmation_code': code
+        })
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize('username, email, field', [
+        ('ALICE', 'other@yamdb.fake', 'username'),
+        ('other', 'Alice@Yamdb.fake', 'email'),
+    ])
+    def test_taken_username_or_email(self, client, username, email, field):
+        signup(client, 'alice', 'alice@yamdb.fake')
+        response = signup(client, username, email)
+        assert response.status_code == 400
+        assert field in response.json()
+        assert User.objects.count() == 1
+
+    def test_both_taken_by_different_users(self, client):
+        signup(client, 'alice', 'alice@yamdb.fake')
+        signup(client, 'bob', 'bob@yamdb.fake')
+        response = signup(client, 'bob', 'alice@yamdb.fake')
+        assert response.status_code == 400
+        assert set(response.json()) == {'username', 'email'}
+
+    def test_unique_ignoring_case(self):
+        User.objects.create(username='alice', email='alice@yamdb.fake')
+        for username, email in (('Alice', 'a@yamdb.fake'),
+                                ('other', 'ALICE@yamdb.fake')):
+            with pytest.raises(IntegrityError), transaction.atomic():
+                User.objects.create(username=username, email=email)
+
+    def test_users_endpoint_unique_ignoring_case(self, client):
+        alice = User.objects.create(username='alice', email='alice@yamdb.fake')
+        admin = User.objects.create(
+            username='admin', email='admin@yamdb.fake', role=User.ADMIN
+        )
+        headers = {'HTTP_AUTHORIZATION':
+                   f'Bearer {get_tokens_for_user(admin)["access"]}'}
+        response = client.post('/api/v1/users/', {
+            'username': 'Alice', 'email': 'new@yamdb.fake'
+        }, **headers)
+        assert response.status_code == 400, (
+            'Имя, отличающееся только регистром, должно давать 400'
+        )
+        assert set(response.json()) == {'username'}
+
+        response = client.patch(
+            '/api/v1/users/me/', {'email': 'ALICE@yamdb.fake'},
+            content_type='application/json', **headers
+        )
+        assert response.status_code == 400
+        assert set(response.json()) == {'email'}
+
+        response = client.patch(
+            f'/api/v1/users/{alice.username}/',
+            {'username': 'ALICE', 'email': 'Alice@yamdb.fake'},
+            content_type='application/json', **headers
+        )
+        assert response.status_code == 200, (
+            'Пользователь может менять регистр своего имени и почты'
+        )
+
+    def test_token_errors(self, client):
+        signup(client, 'alice', 'alice@yamdb.fake')
+        response = client.post(TOKEN_URL, {
+            'username': 'alice', 'confirmation_code': 'wrong'
+        })
+        assert response.status_code == 400
+        response = client.post(TOKEN_URL, {
+            'username': 'nobody', 'confirmation_code': 'wrong'
+        })
+        assert response.status_code == 404
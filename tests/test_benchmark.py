@@ -0,0 +1,12 @@
+from api.management.commands.benchmark import percentile
+
+
+class TestPercentile:
+
+    def test_percentile(self):
+        timings = [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert percentile(timings, .5) == 3.0
+        assert percentile(timings, .95) == 4.8
+        assert percentile(timings, 1) == 5.0
+        assert percentile([7.0], .99) == 7.0
+        assert percentile([], .5) is None
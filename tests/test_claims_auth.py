@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.utils import get_tokens_for_user
+from reviews.models import Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def user():
+    return User.objects.create(username='reader', email='r@yamdb.fake')
+
+
+def auth(user):
+    return {'HTTP_AUTHORIZATION':
+            f'Bearer {get_tokens_for_user(user)["access"]}'}
+
+
+@pytest.mark.django_db
+class TestClaimsAuthentication:
+
+    def test_warm_request_skips_users_table(self, client, user, settings,
+                                            django_assert_num_queries):
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        title = Title.objects.create(name='Title', year=2000)
+        Review.objects.create(title=title, author=user, text='text', score=5)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        headers = auth(user)
+        client.get(url, **headers)
+        with CaptureQueriesContext(connection) as anonymous:
+            client.get(url)
+        with django_assert_num_queries(len(anonymous)):
+            response = client.get(url, **headers)
+        assert response.status_code == 200, (
+            'Запрос с токеном не должен обращаться к таблице пользователей'
+        )
+
+    def test_role_change_applies_to_issued_tokens(
+            self, client, user, django_capture_on_commit_callbacks):
+        headers = auth(user)
+        data = {'name': 'Книга', 'slug': 'book'}
+        response = client.post('/api/v1/categories/', data, **headers)
+        assert response.status_code == 403
+        with django_capture_on_commit_callbacks(execute=True):
+            user.role = User.ADMIN
+            user.save()
+        response = client.post('/api/v1/categories/', data, **headers)
+        assert response.status_code == 201, (
+            'Смена роли должна действовать для уже выданных токенов'
+        )
+
+    @pytest.mark.parametrize('revoke', ['delete', 'deactivate'])
+    def test_removed_user_is_rejected(
+            self, client, user, revoke, django_capture_on_commit_callbacks):
+        headers = auth(user)
+        assert client.get('/api/v1/users/me/', **headers).status_code == 200
+        with django_capture_on_commit_callbacks(execute=True):
+            if revoke == 'delete':
+                user.delete()
+            else:
+                user.is_active = False
+                user.save()
+        assert client.get('/api/v1/users/me/', **headers).status_code == 401
+
+    def test_me_and_review_create(self, client, user):
+        headers = auth(user)
+        response = client.patch(
+            '/api/v1/users/me/', {'bio': 'bio'},
+            content_type='application/json', **headers
+        )
+        assert response.status_code == 200
+        assert response.json()['bio'] == 'bio'
+
+        title = Title.objects.create(name='Title', year=2000)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = client.post(url, {'text': 'text', 'score': 7}, **headers)
+        assert response.status_code == 201
+        review = Review.objects.get()
+        assert review.author == user
+        response = client.patch(
+            f'{url}{review.id}/', {'text': 'new'},
+            content_type='application/json', **headers
+        )
+        assert response.status_code == 200, (
+            'Автор должен иметь возможность изменить свой отзыв'
+        )
@@ -0,0 +1,104 @@
+import pytest
+from django.utils.http import http_date
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def review():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    title = Title.objects.create(name='Title', year=2000, category=category)
+    author = User.objects.create(username='author', email='a@yamdb.fake')
+    return Review.objects.create(
+        title=title, author=author, text='text', score=5
+    )
+
+
+def urls(review):
+    title_url = f'/api/v1/titles/{review.title_id}/'
+    return {
+        'title': title_url,
+        'reviews': f'{title_url}reviews/',
+        'comments': f'{title_url}reviews/{review.id}/comments/',
+    }
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('name', ['title', 'reviews', 'comments'])
+    def test_not_modified_is_one_query(self, client, settings, review, name,
+                                       django_assert_num_queries):
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        url = urls(review)[name]
+        response = client.get(url)
+        etag = response['ETag']
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=http_date())
+        assert response.status_code == 200, (
+            'Last-Modified с точностью до секунды не должен давать 304'
+        )
+        assert not response.has_header('Last-Modified')
+
+    def test_cached_title_answers_not_modified(self, client, review,
+                                               django_assert_num_queries):
+        url = urls(review)['title']
+        etag = client.get(url)['ETag']
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_new_review_changes_title_etags(
+            self, client, review, django_capture_on_commit_callbacks):
+        etags = {name: client.get(url)['ETag']
+                 for name, url in urls(review).items()}
+        other = User.objects.create(username='other', email='o@yamdb.fake')
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(
+                title=review.title, author=other, text='text', score=1
+            )
+        assert client.get(
+            urls(review)['title'], HTTP_IF_NONE_MATCH=etags['title']
+        ).status_code == 200
+        assert client.get(
+            urls(review)['reviews'], HTTP_IF_NONE_MATCH=etags['reviews']
+        ).status_code == 200
+        assert client.get(
+            urls(review)['comments'], HTTP_IF_NONE_MATCH=etags['comments']
+        ).status_code == 304
+
+    def test_comment_changes_comment_list_etag(self, client, review):
+        url = urls(review)['comments']
+        etag = client.get(url)['ETag']
+        Comment.objects.create(review=review, author=review.author, text='c')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_review_edit_changes_reviews_etag(self, client, review):
+        url = urls(review)['reviews']
+        etag = client.get(url)['ETag']
+        review.text = 'edited'
+        review.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_genre_rename_changes_title_etag(
+            self, client, review, django_capture_on_commit_callbacks):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        review.title.genre.add(genre)
+        url = urls(review)['title']
+        etag = client.get(url)['ETag']
+        with django_capture_on_commit_callbacks(execute=True):
+            genre.name = 'Трагедия'
+            genre.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_query_string_is_part_of_etag(self, client, review):
+        url = urls(review)['reviews']
+        assert client.get(url)['ETag'] != client.get(f'{url}?page=1')['ETag']
+
+    def test_missing_title(self, client):
+        assert client.get('/api/v1/titles/999/reviews/').status_code == 404
+        assert client.get('/api/v1/titles/abc/').status_code == 404
@@ -0,0 +1,85 @@
+import pytest
+from django.utils import timezone
+from reviews.models import Comment, Review
+from users.models import User
+
+
+@pytest.fixture
+def reviews(title):
+    reviews = [
+        Review.objects.create(
+            title=title, text=f'review {i}', score=5,
+            author=User.objects.create(
+                username=f'user{i}', email=f'user{i}@yamdb.fake'
+            )
+        )
+        for i in range(23)
+    ]
+    # ties on pub_date must be broken by id
+    Review.objects.filter(
+        pk__in=[review.pk for review in reviews[5:15]]
+    ).update(pub_date=timezone.now())
+    return list(Review.objects.order_by('pub_date', 'id'))
+
+
+def walk(client, url, direction):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data
+        page = [item['id'] for item in data['results']]
+        ids = page + ids if direction == 'previous' else ids + page
+        url = data[direction]
+    return ids
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_page_number_mode_is_default(self, client, title, reviews):
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['count'] == len(reviews)
+
+    def test_walk_reviews_forward_and_back(self, client, title, reviews):
+        expected = [review.id for review in reviews]
+        forward = walk(
+            client, f'/api/v1/titles/{title.id}/reviews/?cursor=', 'next'
+        )
+        assert forward == expected
+
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor='
+        )
+        last_page_url = response.json()['next']
+        while True:
+            data = client.get(last_page_url).json()
+            if data['next'] is None:
+                break
+            last_page_url = data['next']
+        backward = walk(client, last_page_url, 'previous')
+        assert backward == expected
+
+    def test_walk_comments(self, client, title, reviews):
+        review = reviews[0]
+        comments = [
+            Comment.objects.create(
+                review=review, author=review.author, text=f'comment {i}'
+            )
+            for i in range(12)
+        ]
+        ids = walk(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?cursor=',
+            'next'
+        )
+        assert ids == [comment.id for comment in comments]
+
+    def test_invalid_cursor(self, client, title, reviews):
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=garbage'
+        )
+        assert response.status_code == 404
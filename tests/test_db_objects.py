@@ -0,0 +1,31 @@
+import pytest
+from api_yamdb.db_objects import TITLE_SEARCH_TRIGGERS, USER_LOWER_INDEXES
+from django.db import connection
+
+
+@pytest.mark.django_db
+class TestDbObjects:
+    """
+    A migration that makes SQLite rebuild a table drops these objects,
+    it has to create them again (api_yamdb.db_objects)
+    """
+
+    def test_user_lower_indexes(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, 'users_user'
+            )
+        for name in USER_LOWER_INDEXES:
+            assert name in constraints, f'Индекс {name} потерян'
+
+    def test_title_search_triggers(self):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Full-text search triggers are SQLite only')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                "AND tbl_name = 'reviews_title'"
+            )
+            triggers = {name for name, in cursor.fetchall()}
+        for name in TITLE_SEARCH_TRIGGERS:
+            assert name in triggers, f'Триггер {name} потерян'
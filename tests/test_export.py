@@ -0,0 +1,136 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from api.utils import get_tokens_for_user
+from django.core.asgi import get_asgi_application
+from django.core.management import call_command
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def catalog():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = [Genre.objects.create(name=slug, slug=slug)
+              for slug in ('drama', 'comedy')]
+    titles = []
+    for i in range(5):
+        title = Title.objects.create(
+            name=f'Название {i}', year=2000 + i, description='a, "b"',
+            category=category if i else None
+        )
+        title.genre.set(genres[:i % 3])
+        titles.append(title)
+    author = User.objects.create(username='author', email='a@yamdb.fake')
+    Review.objects.create(title=titles[1], author=author, text='ok', score=8)
+    return titles
+
+
+@pytest.fixture
+def admin_headers():
+    admin = User.objects.create(
+        username='admin', email='admin@yamdb.fake', role=User.ADMIN
+    )
+    return {'HTTP_AUTHORIZATION':
+            f'Bearer {get_tokens_for_user(admin)["access"]}'}
+
+
+def read(response):
+    return b''.join(response.streaming_content).decode()
+
+
+def asgi_get(path, headers):
+    """
+    Response messages of the ASGI application, which consumes
+    streaming responses on the event loop unlike the test client
+    """
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'), *(
+            (name.encode(), value.encode()) for name, value in headers.items()
+        )],
+        'client': ('127.0.0.1', 10000), 'server': ('testserver', 80),
+    }
+    asyncio.run(get_asgi_application()(scope, receive, send))
+    return messages
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_jsonl(self, client, admin_headers, catalog, settings,
+                   django_assert_num_queries):
+        settings.EXPORT_CHUNK_SIZE = 2
+        response = client.get('/api/v1/export/titles.jsonl', **admin_headers)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        # 3 chunks: the titles query and a genre query per chunk
+        with django_assert_num_queries(4):
+            lines = read(response).splitlines()
+        titles = [json.loads(line) for line in lines]
+        assert [title['id'] for title in titles] == [
+            title.id for title in catalog
+        ]
+        assert titles[0]['category'] is None
+        assert titles[1] == {
+            'id': catalog[1].id, 'name': 'Название 1', 'year': 2001,
+            'description': 'a, "b"', 'category': 'movie', 'genre': ['drama'],
+            'rating': 8.0, 'review_count': 1,
+        }
+        assert titles[2]['genre'] == ['comedy', 'drama']
+
+    def test_csv(self, client, admin_headers, catalog):
+        response = client.get('/api/v1/export/reviews.csv', **admin_headers)
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(read(response))))
+        assert rows[0] == ['id', 'title', 'author', 'score', 'text',
+                           'pub_date']
+        assert rows[1][1:5] == [str(catalog[1].id), 'author', '8', 'ok']
+
+    def test_admin_only(self, client, catalog):
+        assert client.get('/api/v1/export/titles.csv').status_code == 401
+        user = User.objects.create(username='user', email='u@yamdb.fake')
+        response = client.get(
+            '/api/v1/export/titles.csv', HTTP_AUTHORIZATION=(
+                f'Bearer {get_tokens_for_user(user)["access"]}'
+            )
+        )
+        assert response.status_code == 403
+
+    def test_command(self, catalog, tmp_path):
+        path = tmp_path / 'titles.csv'
+        call_command('export_catalog', 'titles', format='csv',
+                     output=str(path), chunk_size=2)
+        with open(path, encoding='utf-8', newline='') as file:
+            rows = list(csv.reader(file))
+        assert len(rows) == len(catalog) + 1
+        assert rows[3][3:6] == ['a, "b"', 'movie', 'comedy,drama']
+        stdout = io.StringIO()
+        call_command('export_catalog', 'titles', stdout=stdout)
+        assert len(stdout.getvalue().splitlines()) == len(catalog)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi(admin_headers, catalog, settings):
+    settings.EXPORT_CHUNK_SIZE = 2
+    messages = asgi_get('/api/v1/export/titles.jsonl', {
+        'authorization': admin_headers['HTTP_AUTHORIZATION']
+    })
+    assert messages[0]['status'] == 200
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    assert len(body.decode().splitlines()) == len(catalog), (
+        'Под ASGI выгрузка должна читать базу не в потоке event loop'
+    )
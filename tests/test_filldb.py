@@ -0,0 +1,129 @@
+import csv
+import os
+import shutil
+from io import StringIO
+
+import pytest
+from api.copy_loader import COPY_NULL, TABLES, copy_columns, copy_row
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+DATA_PATH = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+@pytest.mark.django_db
+class TestFillDb:
+
+    def test_load_bundled_csv(self):
+        with CaptureQueriesContext(connection) as queries:
+            call_command('filldb', path=DATA_PATH, batch_size=10)
+        assert not any(
+            query['sql'].startswith('UPDATE "reviews_review"')
+            for query in queries
+        ), 'Дата публикации должна записываться в INSERT'
+
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42
+        assert User.objects.count() == 5
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.isoformat() == '2019-09-24T21:08:21.567000+00:00', (
+            'Проверьте, что дата публикации берётся из csv'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.review_count == title.reviews.count(), (
+            'Проверьте, что рейтинги пересчитываются после загрузки'
+        )
+
+    def test_reload_is_idempotent(self):
+        call_command('filldb', path=DATA_PATH)
+        out = StringIO()
+        call_command('filldb', path=DATA_PATH, stdout=out)
+        assert Review.objects.count() == 72
+        assert ('reviews_review: 0 rows loaded, 72 already present'
+                in out.getvalue())
+
+        call_command('filldb', path=DATA_PATH, truncate=True)
+        assert Review.objects.count() == 72
+
+    def test_conflicting_rows_are_not_referenced(self, tmp_path):
+        path = str(tmp_path / 'data')
+        shutil.copytree(DATA_PATH, path)
+        with open(os.path.join(path, 'review.csv'), encoding='utf-8',
+                  newline='') as file:
+            review = next(csv.DictReader(file))
+        # same title and author as review 1: violates the unique constraint
+        with open(os.path.join(path, 'review.csv'), 'a', encoding='utf-8',
+                  newline='') as file:
+            file.write('\n')
+            csv.writer(file).writerow([
+                1000, review['title_id'], 'text', review['author'], 5,
+                review['pub_date']
+            ])
+        with open(os.path.join(path, 'comments.csv'), 'a', encoding='utf-8',
+                  newline='') as file:
+            file.write('\n')
+            csv.writer(file).writerow(
+                [1000, 1000, 'text', review['author'], review['pub_date']]
+            )
+        out = StringIO()
+        call_command('filldb', path=path, stdout=out)
+
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        report = out.getvalue()
+        assert ('reviews_review: 72 rows loaded, 0 already present, '
+                '1 conflicting' in report), (
+            'Проверьте, что строки, пропущенные при вставке, '
+            'не считаются загруженными'
+        )
+        assert ('reviews_comment: 3 rows loaded, 0 already present, '
+                '0 conflicting, 1 skipped' in report)
+
+    def test_copy_engine_falls_back_on_sqlite(self):
+        if connection.vendor == 'postgresql':
+            pytest.skip('COPY engine is used on PostgreSQL')
+        call_command('filldb', path=DATA_PATH, engine='copy')
+        assert Review.objects.count() == 72
+
+
+class TestCopyRows:
+
+    def test_missing_columns_get_field_defaults(self):
+        row = {
+            'id': '100', 'username': 'bingobongo',
+            'email': 'bingobongo@yamdb.fake', 'role': 'user',
+            'bio': '', 'first_name': '', 'last_name': ''
+        }
+        columns = copy_columns(User, row.keys())
+        values = dict(
+            (field.column, value)
+            for (field, _), value in zip(columns, copy_row(columns, row))
+        )
+        assert values['id'] == 100
+        assert values['bio'] == ''
+        assert values['password'] == ''
+        assert values['is_superuser'] is False
+        assert values['last_login'] == COPY_NULL
+        assert values['date_joined'] is not None
+
+    @pytest.mark.parametrize('filename, label', [
+        (filename, label) for filename, label, _ in TABLES
+    ])
+    def test_no_nulls_in_not_null_columns(self, filename, label):
+        model = apps.get_model(label)
+        with open(os.path.join(DATA_PATH, filename), encoding='utf-8',
+                  newline='') as file:
+            rows = csv.DictReader(file)
+            columns = copy_columns(model, rows.fieldnames)
+            values = copy_row(columns, next(rows))
+        for (field, _), value in zip(columns, values):
+            assert field.null or value != COPY_NULL, (
+                f'{label}.{field.name}: NULL в столбце NOT NULL'
+            )
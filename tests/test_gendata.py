@@ -0,0 +1,54 @@
+import csv
+import os
+
+import pytest
+from django.core.management import CommandError, call_command
+from reviews.models import Review, Title
+
+SIZES = {
+    'titles': 30, 'users': 7, 'reviews': 200, 'comments': 50,
+    'genres': 5, 'categories': 3,
+}
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return list(csv.DictReader(file))
+
+
+def generate(path, **options):
+    call_command('gendata', output=str(path), **{**SIZES, **options})
+    return {
+        filename: read_csv(os.path.join(path, filename))
+        for filename in os.listdir(path)
+    }
+
+
+class TestGenData:
+
+    def test_same_seed_same_data(self, tmp_path):
+        first = generate(tmp_path / 'first')
+        second = generate(tmp_path / 'second')
+        other = generate(tmp_path / 'other', seed=1)
+        assert first == second, 'Проверьте, что генерация воспроизводима'
+        assert first['review.csv'] != other['review.csv']
+
+    def test_review_authors_are_unique_per_title(self, tmp_path):
+        data = generate(tmp_path)
+        reviews = data['review.csv']
+        assert len(reviews) == SIZES['reviews']
+        pairs = {(row['title_id'], row['author']) for row in reviews}
+        assert len(pairs) == len(reviews)
+        assert all(1 <= int(row['score']) <= 10 for row in reviews)
+
+    def test_too_many_reviews(self, tmp_path):
+        with pytest.raises(CommandError):
+            generate(tmp_path, reviews=SIZES['titles'] * SIZES['users'] + 1)
+
+    @pytest.mark.django_db
+    def test_load(self, tmp_path):
+        generate(tmp_path, load=True)
+        assert Review.objects.count() == SIZES['reviews']
+        assert sum(
+            Title.objects.values_list('review_count', flat=True)
+        ) == SIZES['reviews']
@@ -0,0 +1,102 @@
+import pytest
+from django.core.management import call_command
+from reviews.leaderboard import get_prior
+from reviews.models import Category, Genre, Review, Title, TitleRank
+from users.models import User
+
+URL = '/api/v1/titles/top/'
+
+
+@pytest.fixture
+def catalog(settings):
+    settings.API_RESPONSE_CACHE = {'ENABLED': False}
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    users = [User.objects.create(username=f'user{i}', email=f'{i}@yamdb.fake')
+             for i in range(20)]
+    titles = {}
+    for name, category, genres, scores in (
+        ('single', movie, [drama], [10]),
+        ('classic', movie, [drama, comedy], [8] * 20),
+        ('novel', book, [drama], [9] * 10),
+        ('flop', book, [comedy], [2] * 5),
+    ):
+        title = Title.objects.create(name=name, year=2000, category=category)
+        title.genre.set(genres)
+        for user, score in zip(users, scores):
+            Review.objects.create(
+                title=title, author=user, text='text', score=score
+            )
+        titles[name] = title
+    call_command('rebuild_ratings')
+    return titles, users
+
+
+def names(client, **params):
+    response = client.get(URL, params)
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()]
+
+
+@pytest.mark.django_db
+class TestLeaderboard:
+
+    def test_boards(self, client, catalog, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert names(client) == ['novel', 'classic', 'single', 'flop'], (
+                'Один отзыв 10/10 не должен обгонять проверенные произведения'
+            )
+        assert names(client, genre='comedy') == ['classic', 'flop']
+        assert names(client, category='movie') == ['classic', 'single']
+        assert names(client, category='book', genre='drama') == ['novel']
+        assert names(client, genre='unknown') == []
+        assert names(client, limit=2) == ['novel', 'classic']
+
+    def test_response(self, client, catalog):
+        titles, _ = catalog
+        prior = get_prior()
+        assert client.get(URL, {'limit': 1}).json() == [{
+            'id': titles['novel'].id, 'name': 'novel', 'year': 2000,
+            'category': {'name': 'Книга', 'slug': 'book'}, 'rating': 9.0,
+            'review_count': 10, 'score': pytest.approx(prior.score(90, 10)),
+        }]
+        assert client.get(URL, {'limit': 0}).status_code == 400
+        assert client.get(URL, {'limit': 1000}).status_code == 400
+
+    def test_incremental(self, client, catalog):
+        titles, users = catalog
+        single = titles['single']
+        for user in users[1:]:
+            Review.objects.create(
+                title=single, author=user, text='text', score=10
+            )
+        assert names(client)[0] == 'single'
+        review = single.reviews.get(author=users[0])
+        review.score = 1
+        review.save()
+        review.delete()
+
+        single.category = Category.objects.get(slug='book')
+        single.save()
+        single.genre.remove(Genre.objects.get(slug='drama'))
+        assert names(client, category='movie') == ['classic']
+        assert names(client, genre='drama') == ['novel', 'classic']
+
+        prior = get_prior()
+        expected = {
+            title.id: prior.score(title.review_sum, title.review_count)
+            for title in Title.objects.all()
+        }
+        for rank in TitleRank.objects.all():
+            assert rank.score == pytest.approx(expected[rank.title_id]), (
+                'Строки рейтинга должны совпадать с пересчётом с нуля'
+            )
+        # a row per title and per genre of a title
+        assert TitleRank.objects.count() == 4 + 4
+
+    def test_title_deleted(self, client, catalog):
+        titles, _ = catalog
+        titles['novel'].delete()
+        assert names(client) == ['classic', 'single', 'flop']
@@ -0,0 +1,84 @@
+import pytest
+from api.mail import claim, deliver_batch, enqueue_mail
+from api.models import OutboundEmail
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionRefusedError('mail server is down')
+
+
+def enqueue(count):
+    for i in range(count):
+        enqueue_mail('Subject', 'Body', f'user{i}@yamdb.fake')
+
+
+@pytest.mark.django_db
+class TestMailQueue:
+
+    def test_signup_only_enqueues(self, client):
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'new', 'email': 'new@yamdb.fake'
+        })
+        assert response.status_code == 200
+        assert not mail.outbox, 'Регистрация не должна отправлять письмо сама'
+        message = OutboundEmail.objects.get()
+        assert message.recipient == 'new@yamdb.fake'
+        assert message.status == OutboundEmail.PENDING
+
+        call_command('deliver_mail', once=True)
+        assert [sent.to for sent in mail.outbox] == [['new@yamdb.fake']]
+        message.refresh_from_db()
+        assert message.status == OutboundEmail.SENT
+        assert message.sent is not None
+
+    def test_connection_per_worker(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_mail_queue.CountingBackend'
+        CountingBackend.opened = 0
+        enqueue(10)
+        assert deliver_batch(workers=2) == (10, 0)
+        assert len(mail.outbox) == 10
+        assert CountingBackend.opened == 2, (
+            'Каждый поток должен отправлять письма через одно соединение'
+        )
+
+    def test_retries_then_fails(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_mail_queue.FailingBackend'
+        enqueue(1)
+        assert deliver_batch(max_attempts=2) == (0, 1)
+        message = OutboundEmail.objects.get()
+        assert message.status == OutboundEmail.PENDING
+        assert message.attempts == 1
+        assert 'mail server is down' in message.last_error
+        assert message.send_after > timezone.now(), (
+            'Повторная попытка должна откладываться'
+        )
+        assert deliver_batch(max_attempts=2) == (0, 0)
+
+        OutboundEmail.objects.update(send_after=timezone.now())
+        assert deliver_batch(max_attempts=2) == (0, 1)
+        message.refresh_from_db()
+        assert message.status == OutboundEmail.FAILED
+
+    def test_claimed_messages_are_leased(self):
+        enqueue(3)
+        assert len(claim(2, lease=300)) == 2
+        assert len(claim(2, lease=300)) == 1
+        assert claim(2, lease=300) == []
+        OutboundEmail.objects.update(send_after=timezone.now())
+        assert len(claim(3, lease=300)) == 3, (
+            'Письма остановившегося воркера должны вернуться в очередь'
+        )
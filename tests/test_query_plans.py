@@ -0,0 +1,142 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from reviews.leaderboard import top_titles
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+PAGE = slice(0, 10)
+
+
+@pytest.fixture
+def seeded():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    User.objects.bulk_create(
+        User(username=f'user{i}', email=f'{i}@yamdb.fake') for i in range(30)
+    )
+    users = list(User.objects.all())
+    titles = []
+    for i in range(40):
+        title = Title.objects.create(
+            name=f'Title {i}', year=1980 + i % 20, category=category
+        )
+        title.genre.add(genre)
+        titles.append(title)
+    for title in titles[:5]:
+        for user in users:
+            review = Review.objects.create(
+                title=title, author=user, text='text', score=5
+            )
+        for user in users:
+            Comment.objects.create(review=review, author=user, text='text')
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return titles[0], review
+
+
+def explain(queryset):
+    if connection.vendor == 'postgresql':
+        # on a small seed a sequential scan is cheaper anyway,
+        # the test is whether an index can serve the query
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+
+def sequential_scans(plan, table):
+    if connection.vendor == 'postgresql':
+        return re.findall(rf'Seq Scan on {table}\b', plan)
+    return [line for line in plan.splitlines()
+            if re.search(rf'\bSCAN (TABLE )?{table}\b', line)
+            and 'USING' not in line]
+
+
+def sorts(plan):
+    if connection.vendor == 'postgresql':
+        return re.findall(r'Sort Key: .*', plan)
+    return re.findall(r'USE TEMP B-TREE FOR ORDER BY', plan)
+
+
+def assert_indexed(queryset, index=None, ordered=True):
+    plan = explain(queryset)
+    # joined lookup tables may be tiny, only the queried table matters
+    table = queryset.model._meta.db_table
+    assert not sequential_scans(plan, table), (
+        f'Запрос должен использовать индекс, а не полный перебор:\n{plan}'
+    )
+    if index:
+        assert index in plan, f'Запрос должен использовать {index}:\n{plan}'
+    if ordered:
+        assert not sorts(plan), (
+            f'Порядок должен браться из индекса, без сортировки:\n{plan}'
+        )
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    def test_reviews_of_title(self, seeded):
+        title, review = seeded
+        reviews = Review.objects.filter(title_id=title.id)
+        assert_indexed(
+            reviews.select_related('author')[PAGE],
+            'review_title_pub_date_idx'
+        )
+        assert_indexed(
+            reviews.filter(
+                Q(pub_date__gt=review.pub_date)
+                | Q(pub_date=review.pub_date, id__gt=review.id)
+            ).order_by('pub_date', 'id')[PAGE],
+            'review_title_pub_date_idx'
+        )
+        assert_indexed(
+            reviews.order_by('-pub_date', '-id')[PAGE],
+            'review_title_pub_date_idx'
+        )
+
+    def test_comments_of_review(self, seeded):
+        _, review = seeded
+        comments = Comment.objects.filter(review_id=review.id)
+        assert_indexed(
+            comments.select_related('author')[PAGE],
+            'comment_review_pub_date_idx'
+        )
+        assert_indexed(
+            comments.filter(
+                pub_date__gt=timezone.now() - timedelta(days=1)
+            ).order_by('pub_date', 'id')[PAGE],
+            'comment_review_pub_date_idx'
+        )
+
+    def test_titles(self, seeded):
+        titles = Title.objects.select_related('category')
+        assert_indexed(titles[PAGE], 'title_name_idx')
+        assert_indexed(titles.filter(year=1990)[PAGE], 'title_year_name_idx')
+
+    def test_one_review_per_author_check(self, seeded):
+        title, review = seeded
+        assert_indexed(
+            Review.objects.filter(title_id=title.id, author_id=review.author_id),
+            ordered=False
+        )
+
+    def test_user_lookups_ignore_case(self, seeded):
+        users = User.objects.matching(username='USER1', email='1@YAMDB.fake')
+        assert_indexed(users, 'users_user_username_lower_uniq', ordered=False)
+        assert_indexed(users, 'users_user_email_lower_uniq', ordered=False)
+
+    def test_leaderboard(self, seeded):
+        assert_indexed(top_titles(), 'title_rank_genre_score_idx')
+        assert_indexed(top_titles(genre='drama'), 'title_rank_genre_score_idx')
+        assert_indexed(
+            top_titles(genre='drama', category='movie'),
+            'title_rank_category_score_idx'
+        )
+        assert_indexed(
+            top_titles(category='movie'), 'title_rank_category_score_idx'
+        )
@@ -0,0 +1,128 @@
+import asyncio
+import sqlite3
+
+import pytest
+from api.middleware import ReplicaRoutingMiddleware
+from api.routers import ReplicaRouter
+from api.utils import get_tokens_for_user
+from django.db import connection, connections, router
+from django.test import AsyncClient
+from reviews.models import Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def users():
+    return [User.objects.create(username=f'user{i}', email=f'{i}@yamdb.fake')
+            for i in range(2)]
+
+
+@pytest.fixture
+def replica(tmp_path, settings, users, title):
+    """
+    Second SQLite database with a copy of the test database that is
+    never updated: replication lag that does not end
+    """
+    if connection.vendor != 'sqlite':
+        pytest.skip('The replica is a copy of an SQLite database')
+    path = str(tmp_path / 'replica.sqlite3')
+    connection.ensure_connection()
+    copy = sqlite3.connect(path)
+    connection.connection.backup(copy)
+    copy.close()
+    connections.databases['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': path
+    }
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+    settings.API_RESPONSE_CACHE = {'ENABLED': False}
+    yield
+    connections['replica'].close()
+    del connections['replica']
+    del connections.databases['replica']
+
+
+def auth(user):
+    return {'HTTP_AUTHORIZATION':
+            f'Bearer {get_tokens_for_user(user)["access"]}'}
+
+
+def review_count(client, title, **headers):
+    response = client.get(f'/api/v1/titles/{title.id}/reviews/', **headers)
+    assert response.status_code == 200
+    return response.json()['count']
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouting:
+
+    def test_reads_your_writes(self, client, users, title, replica):
+        author, other = users
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'text', 'score': 7}, **auth(author)
+        )
+        assert response.status_code == 201
+        assert Review.objects.filter(pk=response.json()['id']).exists()
+        assert review_count(client, title, **auth(author)) == 1, (
+            'Автор должен сразу видеть свой отзыв'
+        )
+        assert review_count(client, title) == 0, (
+            'Анонимное чтение должно идти в реплику'
+        )
+        assert review_count(client, title, **auth(other)) == 0
+
+    def test_window_ends(self, client, settings, users, title, replica):
+        settings.DB_READ_PRIMARY_AFTER_WRITE = 0
+        client.post(f'/api/v1/titles/{title.id}/reviews/',
+                    {'text': 'text', 'score': 7}, **auth(users[0]))
+        assert review_count(client, title, **auth(users[0])) == 0
+
+    def test_response_cache_is_filled_from_primary(self, client, settings,
+                                                   users, title, replica):
+        settings.API_RESPONSE_CACHE = {'ENABLED': True, 'TIMEOUT': 60}
+        url = f'/api/v1/titles/{title.id}/'
+        assert client.get(url).json()['rating'] is None
+        client.post(f'/api/v1/titles/{title.id}/reviews/',
+                    {'text': 'text', 'score': 7}, **auth(users[0]))
+        assert client.get(url).json()['rating'] == 7, (
+            'Кеш ответов не должен заполняться из отстающей реплики'
+        )
+
+    def test_async_reads_your_writes(self, settings, users, title, replica):
+        settings.ROOT_URLCONF = 'api_yamdb.async_urls'
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        author = {'authorization': auth(users[0])['HTTP_AUTHORIZATION']}
+
+        async def requests():
+            client = AsyncClient()
+            created = await client.post(
+                url, {'text': 'text', 'score': 7},
+                content_type='application/json', **author
+            )
+            own = await client.get(url, **author)
+            anonymous = await client.get(url)
+            return created, own, anonymous
+
+        created, own, anonymous = asyncio.run(requests())
+        assert created.status_code == 201
+        assert own.json()['count'] == 1, (
+            'Под ASGI автор тоже должен сразу видеть свой отзыв'
+        )
+        assert anonymous.json()['count'] == 0
+
+    def test_outside_requests(self, replica):
+        assert router.db_for_read(Title) == 'default'
+        assert router.db_for_write(Title) == 'default'
+        assert not ReplicaRouter().allow_migrate('replica', 'reviews')
+
+
+def test_async_capable(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+
+    async def get_response(request):
+        return None
+
+    assert asyncio.iscoroutinefunction(
+        ReplicaRoutingMiddleware(get_response)
+    ), 'Под ASGI middleware не должно переводить цепочку в синхронный поток'
@@ -0,0 +1,79 @@
+import pytest
+from reviews.models import Genre, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def other_title(title):
+    return Title.objects.create(
+        name='Other', year=2001, category=title.category
+    )
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_hit_skips_database(self, client, title,
+                                django_assert_num_queries):
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{title.id}/',
+                    '/api/v1/genres/', '/api/v1/categories/'):
+            first = client.get(url)
+            with django_assert_num_queries(0):
+                second = client.get(url)
+            assert second.status_code == 200
+            assert second.content == first.content
+
+    def test_query_string_is_normalized(self, client, title,
+                                        django_assert_num_queries):
+        client.get('/api/v1/titles/?year=2000&genre=drama')
+        with django_assert_num_queries(0):
+            client.get('/api/v1/titles/?genre=drama&year=2000')
+
+    def test_review_invalidates_only_its_title(
+            self, client, title, other_title, django_assert_num_queries,
+            django_capture_on_commit_callbacks):
+        client.get(f'/api/v1/titles/{title.id}/')
+        client.get(f'/api/v1/titles/{other_title.id}/')
+        author = User.objects.create(username='author', email='a@yamdb.fake')
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(
+                title=title, author=author, text='t', score=4
+            )
+
+        assert client.get(
+            f'/api/v1/titles/{title.id}/'
+        ).json()['rating'] == 4
+        assert client.get('/api/v1/titles/').json()['results'][1][
+            'rating'] == 4
+        with django_assert_num_queries(0):
+            client.get(f'/api/v1/titles/{other_title.id}/')
+
+    def test_genre_change_invalidates_titles(
+            self, client, title, django_capture_on_commit_callbacks):
+        client.get(f'/api/v1/titles/{title.id}/')
+        client.get('/api/v1/genres/')
+        with django_capture_on_commit_callbacks(execute=True):
+            Genre.objects.filter(slug='drama').get().delete()
+        assert client.get(f'/api/v1/titles/{title.id}/').json()['genre'] == []
+        assert client.get('/api/v1/genres/').json()['results'] == []
+
+    def test_invalidated_on_commit(self, client, title,
+                                   django_assert_num_queries,
+                                   django_capture_on_commit_callbacks):
+        url = f'/api/v1/titles/{title.id}/'
+        client.get(url)
+        with django_capture_on_commit_callbacks(execute=True):
+            title.name = 'New'
+            title.save()
+            with django_assert_num_queries(0):
+                assert client.get(url).json()['name'] == 'Title', (
+                    'До коммита версии кеша не должны меняться'
+                )
+        assert client.get(url).json()['name'] == 'New'
+
+    def test_authenticated_requests_bypass_cache(self, client, title):
+        client.get('/api/v1/titles/')
+        response = client.get(
+            '/api/v1/titles/', HTTP_AUTHORIZATION='Bearer invalid'
+        )
+        assert response.status_code == 401
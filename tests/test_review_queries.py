@@ -0,0 +1,74 @@
+import pytest
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+# parent existence (the conditional GET lookup) + count + page with authors
+LIST_QUERY_BUDGET = 3
+# parent existence + page with authors
+CURSOR_QUERY_BUDGET = 2
+# parent existence + object with author
+DETAIL_QUERY_BUDGET = 2
+
+
+@pytest.fixture
+def review():
+    title = Title.objects.create(name='Title', year=2000)
+    authors = [
+        User.objects.create(username=f'author{i}', email=f'{i}@yamdb.fake')
+        for i in range(12)
+    ]
+    for i, author in enumerate(authors):
+        Review.objects.create(
+            title=title, author=author, text='text', score=i % 10 + 1
+        )
+    review = Review.objects.first()
+    for author in authors:
+        Comment.objects.create(review=review, author=author, text='text')
+    return review
+
+
+def urls(review):
+    reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+    return {
+        'reviews': reviews_url,
+        'comments': f'{reviews_url}{review.id}/comments/',
+    }
+
+
+@pytest.mark.django_db
+class TestReviewQueryBudget:
+
+    @pytest.mark.parametrize('name', ['reviews', 'comments'])
+    @pytest.mark.parametrize('params, budget', [
+        ({}, LIST_QUERY_BUDGET),
+        ({'page': 2}, LIST_QUERY_BUDGET),
+        ({'cursor': ''}, CURSOR_QUERY_BUDGET),
+    ])
+    def test_list(self, client, settings, review, name, params, budget,
+                  django_assert_max_num_queries):
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        with django_assert_max_num_queries(budget):
+            response = client.get(urls(review)[name], params)
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert results and all(result['author'] for result in results), (
+            'Проверьте, что в ответе есть авторы'
+        )
+
+    @pytest.mark.parametrize('name', ['reviews', 'comments'])
+    def test_detail(self, client, review, name,
+                    django_assert_max_num_queries):
+        url = urls(review)[name]
+        obj_id = client.get(url).json()['results'][0]['id']
+        with django_assert_max_num_queries(DETAIL_QUERY_BUDGET):
+            response = client.get(f'{url}{obj_id}/')
+        assert response.status_code == 200
+
+    def test_missing_parent(self, client, review):
+        assert client.get(
+            f'/api/v1/titles/{review.title_id + 1}/reviews/'
+        ).status_code == 404
+        assert client.get(
+            f'/api/v1/titles/{review.title_id + 1}/reviews/'
+            f'{review.id}/comments/'
+        ).status_code == 404
@@ -0,0 +1,54 @@
+import pytest
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def catalog():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = [Genre.objects.create(name=name, slug=slug)
+              for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'))]
+    title = Title.objects.create(
+        name='Title', year=2000, category=category, description='Описание'
+    )
+    title.genre.set(genres)
+    Title.objects.create(name='Без категории', year=1999)
+    for i in range(3):
+        author = User.objects.create(
+            username=f'author{i}', email=f'a{i}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text=f'text {i}', score=i + 7
+        )
+        Comment.objects.create(review=review, author=author, text='text')
+    return title
+
+
+def paths(title):
+    review = title.reviews.first()
+    reviews = f'/api/v1/titles/{title.id}/reviews/'
+    return [
+        '/api/v1/titles/',
+        '/api/v1/titles/?genre=drama',
+        '/api/v1/titles/?search=title',
+        '/api/v1/titles/?fields=genre,rating',
+        reviews,
+        f'{reviews}?cursor=&page_size=2',
+        f'{reviews}?fields=author,pub_date',
+        f'{reviews}{review.id}/comments/',
+        f'{reviews}{review.id}/comments/?cursor=',
+    ]
+
+
+@pytest.mark.django_db
+def test_same_bytes(client, settings, catalog):
+    settings.API_RESPONSE_CACHE = {'ENABLED': False}
+    for path in paths(catalog):
+        settings.ROW_LIST_SERIALIZERS = False
+        expected = client.get(path)
+        settings.ROW_LIST_SERIALIZERS = True
+        response = client.get(path)
+        assert response.status_code == expected.status_code == 200
+        assert response.content == expected.content, (
+            f'Ответ {path} должен совпадать с ответом сериализатора модели'
+        )
@@ -0,0 +1,84 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import SCORE_FIELDS, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def titles():
+    return [Title.objects.create(name=f'Title {i}', year=2000)
+            for i in range(2)]
+
+
+@pytest.fixture
+def authors():
+    return [User.objects.create(username=f'user{i}', email=f'{i}@yamdb.fake')
+            for i in range(3)]
+
+
+def distribution(title):
+    title.refresh_from_db()
+    return {score: count
+            for score, count in title.score_distribution.items() if count}
+
+
+@pytest.mark.django_db
+class TestScoreDistribution:
+
+    def test_counters_follow_reviews(self, titles, authors):
+        title, other = titles
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='text', score=score
+            )
+            for author, score in zip(authors, (10, 10, 3))
+        ]
+        assert distribution(title) == {'10': 2, '3': 1}
+
+        review = Review.objects.get(pk=reviews[0].pk)
+        review.score = 3
+        review.save()
+        assert distribution(title) == {'10': 1, '3': 2}, (
+            'Изменение оценки должно переносить отзыв между счётчиками'
+        )
+
+        review.title = other
+        review.save()
+        assert distribution(title) == {'10': 1, '3': 1}
+        assert distribution(other) == {'3': 1}
+
+        review.delete()
+        assert distribution(other) == {}
+
+    def test_detail(self, client, settings, titles, authors):
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        title = titles[0]
+        Review.objects.create(title=title, author=authors[0], text='text',
+                              score=7)
+        url = f'/api/v1/titles/{title.id}/'
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.json()['score_distribution'] == {
+            str(score): int(score == 7) for score in range(1, 11)
+        }
+        assert not any('reviews_review' in query['sql'] for query in queries), (
+            'Распределение оценок должно читаться из счётчиков произведения'
+        )
+        assert client.get(url, {'fields': 'score_distribution'}).json() == {
+            'score_distribution': response.json()['score_distribution']
+        }
+        result = client.get('/api/v1/titles/').json()['results'][0]
+        assert 'score_distribution' not in result
+        assert not set(SCORE_FIELDS) & set(result)
+
+    def test_rebuild_fixes_drift(self, titles, authors):
+        title = titles[0]
+        for author, score in zip(authors, (1, 1, 9)):
+            Review.objects.create(
+                title=title, author=author, text='text', score=score
+            )
+        Title.objects.update(score_1=5, score_9=0, score_4=2)
+        call_command('rebuild_ratings')
+        assert distribution(title) == {'1': 2, '9': 1}
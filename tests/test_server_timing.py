@@ -0,0 +1,52 @@
+import asyncio
+import re
+
+import pytest
+from api.middleware import ServerTimingMiddleware
+from django.test import AsyncClient
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+
+    def test_disabled_by_default(self, client, title):
+        response = client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response
+
+    def test_sampled_request_reports_timings(self, client, settings, title,
+                                             caplog):
+        settings.SERVER_TIMING = {'ENABLED': True, 'SAMPLE_RATE': 1}
+        with caplog.at_level('INFO', logger='api.server_timing'):
+            response = client.get('/api/v1/titles/')
+        header = response['Server-Timing']
+        assert re.search(r'db;dur=[\d.]+;desc="3 queries"', header)
+        assert re.search(r'serializer;dur=[\d.]+', header)
+        assert re.search(r'view;dur=[\d.]+', header)
+        assert '"queries": 3' in caplog.text
+
+    def test_not_sampled(self, client, settings, title):
+        settings.SERVER_TIMING = {'ENABLED': True, 'SAMPLE_RATE': 0}
+        response = client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response
+
+
+def test_async_capable(settings):
+    settings.SERVER_TIMING = {'ENABLED': True}
+
+    async def get_response(request):
+        return None
+
+    assert asyncio.iscoroutinefunction(ServerTimingMiddleware(get_response)), (
+        'Под ASGI middleware не должно переводить цепочку в синхронный поток'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_reads_are_counted(settings, title):
+    settings.SERVER_TIMING = {'ENABLED': True, 'SAMPLE_RATE': 1}
+    settings.ROOT_URLCONF = 'api_yamdb.async_urls'
+    response = asyncio.run(AsyncClient().get('/api/v1/titles/'))
+    assert response.status_code == 200
+    assert re.search(
+        r'db;dur=[\d.]+;desc="3 queries"', response['Server-Timing']
+    ), 'Запросы из пула потоков тоже должны учитываться'
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def review():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(
+        name='Title', year=2000, category=category, description='x' * 500
+    )
+    title.genre.add(genre)
+    author = User.objects.create(username='author', email='a@yamdb.fake')
+    review = Review.objects.create(
+        title=title, author=author, text='text', score=5
+    )
+    Comment.objects.create(review=review, author=author, text='text')
+    return review
+
+
+def get(client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return response.json(), [query['sql'] for query in queries]
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_title_list(self, client, settings, review):
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        data, queries = get(client, '/api/v1/titles/', fields='id,name,rating')
+        assert data['results'] == [
+            {'id': review.title_id, 'name': 'Title', 'rating': 5.0}
+        ]
+        assert len(queries) == 2, 'Жанры не должны загружаться'
+        page = queries[-1]
+        assert 'description' not in page and 'reviews_category' not in page, (
+            'Запрос должен загружать только нужные столбцы'
+        )
+
+    def test_title_relations_on_request(self, client, review):
+        data, queries = get(
+            client, f'/api/v1/titles/{review.title_id}/', fields='category'
+        )
+        assert data == {'category': {'name': 'Фильм', 'slug': 'movie'}}
+        assert not any('reviews_genre' in query for query in queries)
+        data, _ = get(client, '/api/v1/titles/', fields='genre')
+        assert data['results'] == [
+            {'genre': [{'name': 'Драма', 'slug': 'drama'}]}
+        ]
+
+    @pytest.mark.parametrize('params', [{}, {'cursor': ''}])
+    def test_reviews_and_comments(self, client, review, params):
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        comment = Comment.objects.get(review=review)
+        for url, pk in ((reviews_url, review.id),
+                        (f'{reviews_url}{review.id}/comments/', comment.id)):
+            data, queries = get(client, url, fields='id,text', **params)
+            assert data['results'] == [{'id': pk, 'text': 'text'}]
+            assert not any('users_user' in query for query in queries), (
+                'Автор не должен загружаться, если он не запрошен'
+            )
+        data, _ = get(client, reviews_url, fields='author,score')
+        assert data['results'] == [{'author': 'author', 'score': 5}]
+
+    def test_all_fields_by_default(self, client, review):
+        data, _ = get(client, f'/api/v1/titles/{review.title_id}/')
+        assert set(data) == {
+            'id', 'name', 'year', 'description', 'rating', 'category', 'genre',
+            'score_distribution'
+        }
+
+    def test_unknown_field(self, client, review):
+        response = client.get('/api/v1/titles/', {'fields': 'id,password'})
+        assert response.status_code == 400
+        assert 'password' in response.json()['fields'][0]
@@ -0,0 +1,98 @@
+import pytest
+from api.utils import get_tokens_for_user
+from django.db import connection
+from reviews.models import Category, Genre, Title
+from users.models import User
+
+URL = '/api/v1/titles/batch/'
+
+
+@pytest.fixture
+def admin_headers():
+    admin = User.objects.create(
+        username='admin', email='admin@yamdb.fake', role=User.ADMIN
+    )
+    return {'HTTP_AUTHORIZATION':
+            f'Bearer {get_tokens_for_user(admin)["access"]}'}
+
+
+@pytest.fixture
+def taxonomy():
+    Category.objects.create(name='Фильм', slug='movie')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+
+
+def item(i, category='movie', genre=('drama', 'comedy')):
+    return {
+        'name': f'Title {i}', 'year': 2000 + i, 'description': 'text',
+        'category': category, 'genre': list(genre),
+    }
+
+
+def post(client, headers, data):
+    return client.post(URL, data, content_type='application/json', **headers)
+
+
+@pytest.mark.django_db
+class TestTitleBatch:
+
+    def test_creates_titles(self, client, admin_headers, taxonomy,
+                            django_assert_max_num_queries):
+        data = [item(i) for i in range(20)] + [item(20, genre=['drama'] * 2)]
+        # categories + genres + savepoint + titles + genre_title rows
+        # + savepoint release + the created titles and their genres
+        # + leaderboard sync: prior, savepoint, titles, delete, genres,
+        # insert, release
+        budget = 15
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # a save per title, post_save syncs its leaderboard rows
+            budget += 8 * len(data)
+        with django_assert_max_num_queries(budget):
+            response = post(client, admin_headers, data)
+        assert response.status_code == 201
+        results = response.json()
+        assert [result['name'] for result in results] == [
+            title['name'] for title in data
+        ], 'Результаты должны идти в порядке запроса'
+        assert all(result['id'] for result in results)
+        assert results[0]['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert {genre['slug'] for genre in results[0]['genre']} == {
+            'drama', 'comedy'
+        }
+        assert Title.objects.count() == 21
+        assert Title.genre.through.objects.count() == 41
+
+    def test_errors_per_item_and_nothing_saved(self, client, admin_headers,
+                                               taxonomy):
+        data = [
+            item(0),
+            item(1, category='book'),
+            item(2, genre=['drama', 'horror']),
+            {**item(3), 'year': 'soon'},
+        ]
+        response = post(client, admin_headers, data)
+        assert response.status_code == 400
+        errors = response.json()
+        assert len(errors) == 4
+        assert errors[0] == {}
+        assert set(errors[1]) == {'category'}
+        assert set(errors[2]) == {'genre'}
+        assert set(errors[3]) == {'year'}
+        assert not Title.objects.exists(), (
+            'При ошибке не должно сохраняться ни одно произведение'
+        )
+
+    def test_size_limit(self, client, admin_headers, taxonomy, settings):
+        settings.TITLE_BATCH_MAX_SIZE = 2
+        response = post(client, admin_headers, [item(i) for i in range(3)])
+        assert response.status_code == 400
+        assert not Title.objects.exists()
+
+    def test_admin_only(self, client, taxonomy):
+        assert post(client, {}, [item(0)]).status_code == 401
+
+    def test_list_is_invalidated(self, client, admin_headers, taxonomy):
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+        post(client, admin_headers, [item(0)])
+        assert client.get('/api/v1/titles/').json()['count'] == 1
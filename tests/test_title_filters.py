@@ -0,0 +1,75 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def titles():
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    melodrama = Genre.objects.create(name='Мелодрама', slug='melodrama')
+    data = [
+        ('Both', 1990, movie, [drama, comedy], 8.5),
+        ('Drama', 2000, movie, [drama], 6.0),
+        ('Comedy', 2010, book, [comedy], None),
+        ('Melodrama', 2020, book, [melodrama], 9.0),
+    ]
+    for name, year, category, genres, rating in data:
+        title = Title.objects.create(
+            name=name, year=year, category=category, rating=rating
+        )
+        title.genre.set(genres)
+
+
+def names(client, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200
+    assert not any('DISTINCT' in query['sql'] for query in queries), (
+        'Фильтрация не должна требовать DISTINCT'
+    )
+    data = response.json()
+    results = [title['name'] for title in data['results']]
+    assert data['count'] == len(results), 'Произведения не должны повторяться'
+    return results
+
+
+@pytest.mark.django_db
+class TestTitleFilters:
+
+    def test_slugs_are_exact(self, client, titles):
+        assert names(client, genre='drama') == ['Both', 'Drama']
+        assert names(client, genre='dram') == []
+        assert names(client, category='movie') == ['Both', 'Drama']
+        assert names(client, category='mov') == []
+
+    def test_any_of_several_slugs(self, client, titles):
+        assert names(client, genre='drama,comedy') == [
+            'Both', 'Comedy', 'Drama'
+        ]
+        assert names(client, category='movie,book') == [
+            'Both', 'Comedy', 'Drama', 'Melodrama'
+        ]
+
+    def test_all_of_several_genres(self, client, titles):
+        assert names(client, genre='drama,comedy', genre_match='all') == [
+            'Both'
+        ]
+        assert names(client, genre='drama,', genre_match='all') == [
+            'Both', 'Drama'
+        ]
+
+    def test_ranges(self, client, titles):
+        assert names(client, year_min=2000, year_max=2010) == [
+            'Comedy', 'Drama'
+        ]
+        assert names(client, rating_min=8.5) == ['Both', 'Melodrama']
+        assert names(client, rating_max=8) == ['Drama']
+
+    def test_invalid_values(self, client, titles):
+        for params in ({'genre_match': 'some'}, {'year_min': 'abc'}):
+            response = client.get('/api/v1/titles/', params)
+            assert response.status_code == 400
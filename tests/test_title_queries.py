@@ -0,0 +1,64 @@
+import pytest
+from reviews.models import Category, Genre, Title
+
+# count + page of titles joined with categories + prefetched genres
+TITLE_LIST_QUERY_BUDGET = 3
+# modified timestamp for conditional GET
+# + title joined with category + prefetched genres
+TITLE_DETAIL_QUERY_BUDGET = 3
+
+
+@pytest.fixture
+def titles():
+    categories = [
+        Category.objects.create(name=f'Category {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Genre {i}', slug=f'genre-{i}')
+        for i in range(4)
+    ]
+    titles = []
+    for i in range(25):
+        title = Title.objects.create(
+            name=f'Title {i:02}', year=2000,
+            category=categories[i % len(categories)]
+        )
+        title.genre.set(genres[i % 2:i % 2 + 3])
+        titles.append(title)
+    return titles
+
+
+@pytest.mark.django_db
+class TestTitleQueryBudget:
+
+    def test_title_list(self, client, titles,
+                        django_assert_max_num_queries):
+        with django_assert_max_num_queries(TITLE_LIST_QUERY_BUDGET):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert results, 'Проверьте, что список произведений не пуст'
+        assert all(result['category'] and result['genre']
+                   for result in results)
+
+    def test_title_list_budget_does_not_grow_with_page(
+            self, client, titles, django_assert_max_num_queries):
+        with django_assert_max_num_queries(TITLE_LIST_QUERY_BUDGET):
+            response = client.get('/api/v1/titles/', {'page': 3})
+        assert response.status_code == 200
+
+    def test_title_list_with_filters(self, client, titles,
+                                     django_assert_max_num_queries):
+        with django_assert_max_num_queries(TITLE_LIST_QUERY_BUDGET):
+            response = client.get(
+                '/api/v1/titles/', {'genre': 'genre-1', 'year': 2000}
+            )
+        assert response.status_code == 200
+
+    def test_title_detail(self, client, titles,
+                          django_assert_max_num_queries):
+        with django_assert_max_num_queries(TITLE_DETAIL_QUERY_BUDGET):
+            response = client.get(f'/api/v1/titles/{titles[0].id}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 3
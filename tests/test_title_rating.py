@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import call_command
+from reviews.models import Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def authors():
+    return [
+        User.objects.create(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(3)
+    ]
+
+
+def counters(title):
+    title.refresh_from_db()
+    return title.rating, title.review_sum, title.review_count
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, authors):
+        assert counters(title) == (None, 0, 0)
+
+        first = Review.objects.create(
+            title=title, author=authors[0], text='text', score=10
+        )
+        Review.objects.create(
+            title=title, author=authors[1], text='text', score=5
+        )
+        assert counters(title) == (7.5, 15, 2), (
+            'Проверьте, что рейтинг пересчитывается при создании отзыва'
+        )
+
+        first = Review.objects.get(pk=first.pk)
+        first.score = 1
+        first.save()
+        assert counters(title) == (3.0, 6, 2), (
+            'Проверьте, что рейтинг пересчитывается при изменении оценки'
+        )
+
+        Review.objects.filter(pk=first.pk).delete()
+        assert counters(title) == (5.0, 5, 1), (
+            'Проверьте, что рейтинг пересчитывается при удалении отзыва'
+        )
+
+    def test_rebuild_ratings_command(self, title, authors):
+        for author, score in zip(authors, (2, 4, 9)):
+            Review.objects.create(
+                title=title, author=author, text='text', score=score
+            )
+        Title.objects.update(rating=None, review_sum=0, review_count=0)
+
+        call_command('rebuild_ratings')
+
+        assert counters(title) == (5.0, 15, 3)
+
+    def test_titles_endpoint_returns_stored_rating(self, client, title,
+                                                   authors):
+        Review.objects.create(
+            title=title, author=authors[0], text='text', score=8
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        result = response.json()['results'][0]
+        assert result['rating'] == 8.0
+        assert 'review_sum' not in result
+        assert 'review_count' not in result
@@ -0,0 +1,61 @@
+import pytest
+from reviews.models import Title
+
+
+def search(client, query, **params):
+    response = client.get('/api/v1/titles/', {'search': query, **params})
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.fixture
+def titles():
+    return [
+        Title.objects.create(
+            name='Сказка о рыбаке и рыбке', year=1835,
+            description='Старик ловил неводом рыбу'
+        ),
+        Title.objects.create(
+            name='Старик и море', year=1952,
+            description='Повесть о рыбаке и большой рыбе'
+        ),
+        Title.objects.create(
+            name='Мастер и Маргарита', year=1967,
+            description='Роман о дьяволе в Москве'
+        ),
+    ]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_name_matches_rank_first(self, client, titles):
+        assert search(client, 'старик') == [
+            'Старик и море', 'Сказка о рыбаке и рыбке'
+        ], 'Совпадения в названии должны идти раньше совпадений в описании'
+
+    def test_every_word_must_match(self, client, titles):
+        assert search(client, 'старик море') == ['Старик и море']
+        assert search(client, 'старик маргарита') == []
+
+    def test_index_follows_writes(self, client, titles,
+                                  django_capture_on_commit_callbacks):
+        title = titles[2]
+        with django_capture_on_commit_callbacks(execute=True):
+            title.name = 'Собачье сердце'
+            title.save()
+        assert search(client, 'маргарита') == []
+        assert search(client, 'сердце') == ['Собачье сердце']
+        with django_capture_on_commit_callbacks(execute=True):
+            title.delete()
+        assert search(client, 'сердце') == []
+
+    @pytest.mark.parametrize('query', ['"', 'старик OR', 'NEAR(море', '*'])
+    def test_query_syntax_is_not_interpreted(self, client, titles, query):
+        search(client, query)
+
+    def test_paginated(self, client, titles):
+        response = client.get(
+            '/api/v1/titles/', {'search': 'рыбаке'}
+        )
+        assert response.json()['count'] == 2